@@ -0,0 +1,194 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+
+import fixtureServer
+import mainCode
+
+# --- Constants ---
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtureServer.py")
+HOST = "127.0.0.1"
+PORT = 8799
+CATEGORY = "car-rental"
+REQUESTS_PER_SECOND = 1000.0  # Lifted so the rate limiter doesn't hide the scraper's own speed
+REGRESSION_THRESHOLD = 0.10  # Slowdown vs. --compare results that gets flagged
+
+# --- Fixture Server ---
+def start_fixture_server(args):
+    """Run fixtureServer.py in its own process so it doesn't share our GIL or RSS"""
+    command = [sys.executable, SERVER_SCRIPT, "--host", HOST, "--port", str(args.port),
+               "--pages", str(args.pages), "--per-page", str(args.per_page),
+               "--latency", str(args.latency), "--error-rate", str(args.error_rate),
+               "--padding", str(args.padding), "--seed", "0"]
+    server = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((HOST, args.port), timeout=0.5).close()
+            return server
+        except OSError:
+            if server.poll() is not None:
+                break
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError(f"Fixture server didn't start on port {args.port}")
+
+# --- Benchmark Cases ---
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+def run_case(case, base_url, verbose=False):
+    """Crawl the fixture category once with main(); runs in a fresh process so peak RSS is this case's own"""
+    os.chdir(tempfile.mkdtemp(prefix="yelu-bench-"))
+    mainCode.BASE_URL = base_url
+    mainCode.REQUESTS_PER_SECOND = mainCode.MAX_REQUESTS_PER_SECOND = REQUESTS_PER_SECOND
+    mainCode.RATE_BURST = int(REQUESTS_PER_SECOND)
+    mainCode.rate_limiter = mainCode.RateLimiter(REQUESTS_PER_SECOND)
+
+    # Every response (and failed connection) passes through observe() with its latency
+    latencies = []
+    list_pages = set()
+    observe = mainCode.rate_limiter.observe
+
+    def record(url, status, latency):
+        latencies.append(latency)
+        if "/category/" in url and status is not None and status < 400:
+            list_pages.add(url)
+        observe(url, status, latency)
+
+    mainCode.rate_limiter.observe = record
+
+    started = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, redirect_stdout(sys.stdout if verbose else devnull):
+        profiles = mainCode.main(engine=case["engine"], max_workers=case["workers"], parser=case["parser"],
+                                 categories=[f"{base_url}/category/{CATEGORY}"], fresh=True,
+                                 output_format=case["format"], parse_processes=case["parse_processes"])
+    elapsed = time.perf_counter() - started
+
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = peak_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return {
+        **case,
+        "seconds": round(elapsed, 3),
+        "profiles": profiles,
+        "pages_per_sec": round(len(list_pages) / elapsed, 2),
+        "profiles_per_sec": round(profiles / elapsed, 2),
+        "requests": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+        "peak_rss_mb": round(peak_rss_mb, 1),
+    }
+
+def case_label(case):
+    processes = case.get("parse_processes", 0)
+    return f"{case['engine']}/{case['parser']}" + (f" with {processes} parse processes" if processes else "")
+
+def case_key(case):
+    return (case["engine"], case["workers"], case["parser"], case["format"], case.get("parse_processes", 0))
+
+def compare(results, fixture, baseline_file):
+    """Print the change in profiles/sec against an earlier --json file; return the regressed cases"""
+    with open(baseline_file, encoding='utf-8') as f:
+        earlier = json.load(f)
+    baseline = {case_key(result): result for result in earlier["results"]}
+
+    regressions = []
+    print(f"\n📈 Compared with {baseline_file}:")
+    if earlier["fixture"] != fixture:
+        print(f"  ⚠️ Different fixture settings there ({earlier['fixture']}), so the numbers aren't comparable")
+    for result in results:
+        before = baseline.get(case_key(result))
+        if not before or not before["profiles_per_sec"]:
+            print(f"  {case_label(result)}: no earlier result")
+            continue
+        change = result["profiles_per_sec"] / before["profiles_per_sec"] - 1
+        flag = ""
+        if change < -REGRESSION_THRESHOLD:
+            flag = "  ⚠️ regression"
+            regressions.append(result)
+        print(f"  {case_label(result)}: {before['profiles_per_sec']} -> "
+              f"{result['profiles_per_sec']} profiles/sec ({change:+.1%}){flag}")
+    return regressions
+
+def print_results(results):
+    columns = ["engine", "workers", "parser", "format", "parse_processes", "seconds", "profiles", "pages_per_sec",
+               "profiles_per_sec", "p50_ms", "p99_ms", "peak_rss_mb"]
+    widths = [max(len(column), *(len(str(result[column])) for result in results)) for column in columns]
+    print("\n" + "  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    for result in results:
+        print("  ".join(str(result[column]).ljust(width) for column, width in zip(columns, widths)))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark main() end to end against the offline fixture server")
+    parser.add_argument("--engine", nargs="+", choices=mainCode.ENGINES, default=mainCode.ENGINES)
+    parser.add_argument("--parser", nargs="+", choices=mainCode.PARSER_BACKENDS, default=[mainCode.PARSER_BACKEND])
+    parser.add_argument("--workers", type=int, default=None,
+                        help=f"default: {mainCode.MAX_WORKERS} sync/pipeline, {mainCode.ASYNC_CONCURRENCY} async")
+    parser.add_argument("--format", choices=mainCode.OUTPUT_FORMATS, default=mainCode.OUTPUT_FORMAT)
+    parser.add_argument("--parse-processes", type=int, nargs="+", default=[mainCode.PARSE_PROCESSES],
+                        metavar="N", help="parse pool sizes to try (0 parses in the fetching threads)")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per case; the median by profiles/sec is kept")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--pages", type=int, default=fixtureServer.CATEGORY_PAGES,
+                        help="list pages in the fixture category")
+    parser.add_argument("--per-page", type=int, default=fixtureServer.COMPANIES_PER_PAGE,
+                        help="companies per list page")
+    parser.add_argument("--latency", type=float, default=fixtureServer.LATENCY_SECONDS,
+                        help="mean server latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=fixtureServer.ERROR_RATE,
+                        help="share of profile requests that get a 503")
+    parser.add_argument("--padding", type=int, default=fixtureServer.PADDING_BYTES,
+                        help="filler bytes per page")
+    parser.add_argument("--json", metavar="FILE", help="write the results here")
+    parser.add_argument("--compare", metavar="FILE", help="flag cases more than "
+                        f"{REGRESSION_THRESHOLD:.0%} slower than in this earlier --json file")
+    parser.add_argument("--verbose", action="store_true", help="show the scraper's own output")
+    args = parser.parse_args()
+
+    cases = [{"engine": engine, "parser": backend, "format": args.format, "parse_processes": processes,
+              "workers": args.workers or (mainCode.ASYNC_CONCURRENCY if engine == "async" else mainCode.MAX_WORKERS)}
+             for engine, backend, processes in itertools.product(args.engine, args.parser, args.parse_processes)]
+    base_url = f"http://{HOST}:{args.port}"
+    fixture = {"pages": args.pages, "per_page": args.per_page, "latency": args.latency,
+               "error_rate": args.error_rate, "padding": args.padding}
+
+    print(f"🧪 Benchmarking {len(cases)} cases against {args.pages} pages x {args.per_page} companies, "
+          f"{args.latency}s latency, {args.error_rate:.0%} errors")
+    server = start_fixture_server(args)
+    results = []
+    try:
+        for case in cases:
+            runs = []
+            for _ in range(max(1, args.repeat)):
+                # A fresh interpreter per run: no warm caches or pools, and RSS isn't shared
+                with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                    runs.append(pool.submit(run_case, case, base_url, args.verbose).result())
+            runs.sort(key=lambda run: run["profiles_per_sec"])
+            results.append(runs[len(runs) // 2])
+            print(f"  ✅ {case_label(case)}: {results[-1]['profiles_per_sec']} profiles/sec")
+    finally:
+        server.terminate()
+        server.wait()
+
+    print_results(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"fixture": fixture, "results": results}, f, indent=2)
+        print(f"📁 Results saved to: {args.json}")
+    if args.compare and compare(results, fixture, args.compare):
+        sys.exit(1)
@@ -0,0 +1,155 @@
+import argparse
+import hashlib
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- Constants ---
+HOST = "127.0.0.1"
+PORT = 8765
+CATEGORY_PAGES = 10  # List pages per category; later pages come back empty
+COMPANIES_PER_PAGE = 20
+LATENCY_SECONDS = 0.05  # Mean delay before every response
+LATENCY_JITTER = 0.5  # Delay varies by up to this fraction either way
+ERROR_RATE = 0.0  # Share of profile requests answered with a 503
+PADDING_BYTES = 20000  # Navigation/script filler so pages weigh what yelu.in's do
+
+# --- Synthetic Pages ---
+def padding(size):
+    """Markup the scraper has to skip over: nav links and an inline script"""
+    links = "".join(f'<li><a href="/category/filler-{i}">Filler category {i}</a></li>'
+                    for i in range(size // 120))
+    script = "var tracking = {};" * (size // 40)
+    return f'<div class="nav"><ul>{links}</ul></div><script>{script}</script>'
+
+def list_page_html(slug, page_num, config):
+    """Category page in yelu.in's markup: div.company.g_0 blocks and an a.pages_no pager"""
+    if page_num > config.pages:
+        return "<html><body><p>No results found</p></body></html>"
+
+    companies = []
+    for i in range(config.per_page):
+        company_id = f"{page_num}-{i}"
+        extra_class = " with_img" if i % 3 == 0 else ""
+        companies.append(
+            f'<div class="company g_0{extra_class}">'
+            f'<h3><a href="/company/{company_id}/{slug}-company-{company_id}">{slug.title()} Company {company_id}</a></h3>'
+            f'<div class="address">Plot {i}, Sector {page_num}, Gurgaon</div>'
+            f'<p>Listed in {slug}, serving customers since {2000 + i}.</p></div>'
+        )
+
+    pager = "".join(f'<li><a class="pages_no" href="/category/{slug}/{p}">{p}</a></li>'
+                    for p in range(1, config.pages + 1))
+    return (f'<html><head><title>{slug}</title></head><body>{padding(config.padding)}'
+            f'<div class="results">{config.pages * config.per_page} results</div>'
+            f'{"".join(companies)}'
+            f'<div class="scroller scroller_with_ul"><ul>{pager}</ul></div></body></html>')
+
+def profile_html(company_id, slug, config):
+    """Profile page with #company_name and div.info / div.label / div.text blocks"""
+    name = slug.replace("-", " ").title()
+    return (f'<html><head><title>{name}</title></head><body>{padding(config.padding)}'
+            f'<div id="company_name">{name} &amp; Sons</div>'
+            f'<div id="company_address">Plot {company_id}, Industrial Area, Gurgaon</div>'
+            f'<div class="info"><div class="label">Contact number</div>'
+            f'<div class="text"><a href="tel:0124{company_id}">0124-{company_id}</a></div></div>'
+            f'<div class="info"><div class="label">Mobile phone</div>'
+            f'<div class="text">98100 {company_id} / 98110 {company_id}</div></div>'
+            f'<div class="info"><div class="label">Website address</div>'
+            f'<div class="text"><a href="http://example.com/{company_id}">www.{slug}.example.com</a></div></div>'
+            f'<div class="extra_info"><div class="info"><div class="label">Company manager</div>'
+            f'Mr. Manager {company_id}</div></div></body></html>')
+
+# --- Request Handling ---
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so connection pooling behaves as it would live
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        config = self.server.config
+        time.sleep(config.latency * random.uniform(1 - LATENCY_JITTER, 1 + LATENCY_JITTER))
+
+        category = re.fullmatch(r"/category/([\w-]+)(?:/(\d+))?/?", self.path)
+        profile = re.fullmatch(r"/company/([\d-]+)/([\w-]+)", self.path)
+        if category:
+            body = list_page_html(category.group(1), int(category.group(2) or 1), config)
+        elif profile:
+            if random.random() < config.error_rate:
+                self.server.count("errors")
+                self.send_error_response(503)
+                return
+            body = profile_html(*profile.groups(), config)
+        else:
+            self.send_error_response(404)
+            return
+
+        self.server.count("list_pages" if category else "profiles")
+        data = body.encode("utf-8")
+        etag = '"%s"' % hashlib.sha1(data).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_error_response(self, status):
+        self.send_response(status)
+        if status == 503:
+            self.send_header("Retry-After", "1")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+class FixtureServer(ThreadingHTTPServer):
+    """Stand-in for yelu.in that serves any /category/<slug> and its profiles"""
+    daemon_threads = True
+
+    def __init__(self, config):
+        super().__init__((config.host, config.port), FixtureHandler)
+        self.config = config
+        self.lock = threading.Lock()
+        self.counters = {}
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve synthetic yelu.in pages for offline runs and benchmarks")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--pages", type=int, default=CATEGORY_PAGES, help="list pages per category")
+    parser.add_argument("--per-page", type=int, default=COMPANIES_PER_PAGE, help="companies per list page")
+    parser.add_argument("--latency", type=float, default=LATENCY_SECONDS, help="mean seconds before each response")
+    parser.add_argument("--error-rate", type=float, default=ERROR_RATE,
+                        help="share of profile requests answered with a 503 (0-1)")
+    parser.add_argument("--padding", type=int, default=PADDING_BYTES, help="filler bytes per page")
+    parser.add_argument("--seed", type=int, default=None, help="make the injected errors repeatable")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    config = parse_args()
+    if config.seed is not None:
+        random.seed(config.seed)
+    server = FixtureServer(config)
+    print(f"🧪 Fixture server on http://{config.host}:{config.port}/category/<name> "
+          f"({config.pages} pages x {config.per_page} companies, {config.latency}s latency, "
+          f"{config.error_rate:.0%} errors)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"📊 Served: {server.counters}")
+        server.server_close()
@@ -1,217 +1,2250 @@
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import csv
 import time
+import argparse
+import asyncio
+import threading
+import queue
+import json
+import re
+import os
+import hashlib
+import random
+import codecs
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import sqlite3
+import functools
+import sys
+import io
+import cProfile
+import pstats
+import multiprocessing
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, urlunsplit, urljoin, parse_qsl, urlencode
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
-# --- Setup session with retry logic ---
-session = requests.Session()
-retry_strategy = Retry(total=3, backoff_factor=2)
-adapter = HTTPAdapter(max_retries=retry_strategy)
-session.mount("https://", adapter)
+try:
+    import aiohttp  # Only needed for the async engine
+except ImportError:
+    aiohttp = None
+
+try:
+    import lxml  # Only needed for the "lxml" parser backend
+except ImportError:
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser  # Only needed for the "selectolax" parser backend
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import httpx  # Only needed for HTTP/2 (with the h2 extra)
+except ImportError:
+    httpx = None
+
+try:
+    import pyarrow  # Only needed for Parquet and Arrow output
+    import pyarrow.ipc
+    import pyarrow.parquet as pyarrow_parquet
+except ImportError:
+    pyarrow = None
 
 # --- Constants ---
 BASE_URL = "https://www.yelu.in"
-CATEGORY_URL = f"{BASE_URL}/category/car-rental"
-OUTPUT_CSV = "car_rental_filtered_listings.csv"
+CATEGORY_URL = f"{BASE_URL}/category/car-rental"  # Crawled when no manifest is given
+# Per-category files; {slug} is the category name, e.g. car_rental
+OUTPUT_FILE = "{slug}_filtered_listings"  # Plus the output format's extension
+DELTA_CSV = "{slug}_delta.csv"  # New/changed/removed listings from an incremental run
+STATE_FILE = "{slug}_state.json"  # Profiles seen on earlier incremental runs
+JOURNAL_FILE = "{slug}_crawl.journal"  # Progress of an unfinished crawl, used to resume it
+FRONTIER_DB = "crawl_frontier.sqlite"  # Profile URLs already scheduled, shared by all categories
 HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"}
+MAX_WORKERS = 8  # Profile pages fetched in parallel per list page
+REQUESTS_PER_SECOND = 4.0  # Starting rate per host; adapts between the bounds below
+MIN_REQUESTS_PER_SECOND = 0.5
+MAX_REQUESTS_PER_SECOND = 20.0
+RATE_BURST = 4  # Requests a host may receive back to back after being idle
+RATE_INCREASE = 0.1  # Added to a host's rate after each healthy response
+RATE_DECREASE = 0.5  # Rate multiplier after a 429, 5xx or connection failure
+SLOW_RESPONSE_SECONDS = 3.0  # Responses slower than this nudge the rate down
+RETRY_ATTEMPTS = 4  # Extra tries after the first for retryable failures
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_BACKOFF = 2.0  # Seconds; the backoff cap doubles with every attempt
+RETRY_MAX_DELAY = 120.0  # Longest we wait before a retry, even if Retry-After asks for more
+DEAD_LETTER_CSV = "{slug}_dead_letter.csv"  # Profiles that still failed after the end-of-run retry
+MAX_PAGES = 199  # Upper bound when the pager can't be read
+MAX_FAILED_PAGES = 5  # List pages that may fail after retries before the crawl gives up (rerun to resume)
+POOL_HOSTS = 4  # Distinct hosts we keep connection pools for
+KEEPALIVE_SECONDS = 60  # How long idle connections are kept for reuse
+MAX_RESPONSE_BYTES = 5 * 1024 * 1024  # Larger bodies are abandoned rather than buffered
+READ_CHUNK_BYTES = 64 * 1024
+DEFAULT_ENCODING = "utf-8"  # Used when Content-Type names no charset (no charset sniffing)
+HTTP2 = False  # Use httpx with HTTP/2 multiplexing instead of requests (sync/pipeline engines)
+ENGINE = "sync"  # "sync" (requests + threads), "async" (asyncio + aiohttp) or "pipeline"
+ENGINES = ["sync", "async", "pipeline"]
+ASYNC_CONCURRENCY = 100  # Max in-flight requests for the async engine
+PIPELINE_QUEUE_SIZE = 64  # Profile URLs the discovery stage may run ahead by
+PIPELINE_REORDER_WINDOW = 256  # Profiles discovered past the oldest one not yet written, e.g. while it retries
+PARSER_BACKEND = "html.parser"  # "html.parser", "lxml" or "selectolax"
+PARSER_BACKENDS = ["html.parser", "lxml", "selectolax"]
+PARTIAL_PARSING = True  # Only build the parts of each page the extractors read
+PARSE_PROCESSES = 0  # Processes that parse profile pages; 0 parses in the fetching thread
+HTTP_CACHE_DIR = ".http_cache"  # Where revalidatable responses are kept between runs
+DIAGNOSTICS = False  # Collect per-page structure counters (reported at the end of the run)
+VERBOSE = False  # Print a line per profile and company; otherwise they are only counted
+HISTOGRAM_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]  # Seconds
+MAX_SPANS = 100000  # Spans kept when tracing, so a huge crawl can't exhaust memory
+METRICS_HOST = "127.0.0.1"  # Interface --metrics-port listens on
+PROFILE_REPORT = "profile_report.txt"  # Per-stage breakdown written by --profile (cProfile data goes next to it)
+PROFILE_SAMPLE_INTERVAL = 0.01  # Seconds between stack samples in --profile mode
+PROFILE_TOP = 25  # Functions listed per section of the profile report
+OUTPUT_FORMAT = "csv"  # "csv", "jsonl", "parquet", "arrow" or "sqlite"
+OUTPUT_FORMATS = ["csv", "jsonl", "parquet", "arrow", "sqlite"]
+ROW_GROUP_SIZE = 1000  # Rows per Parquet row group / Arrow record batch
+WRITE_BATCH_ROWS = 200  # Rows the writer stage collects before writing them out
+WRITE_FLUSH_SECONDS = 2.0  # Longest a queued row waits to be written (and journaled)
+SQLITE_BATCH_ROWS = 500  # Upserts per transaction when no journal forces an earlier commit
+FIELDNAMES = [
+    "Company Name", "Address", "Contact Number", "Mobile Phone",
+    "Website Address", "Company Manager", "Profile URL"
+]
+
+# --- Run Metrics ---
+class Metrics:
+    """Thread-safe counters, latency histograms and optional spans.
+
+    Counters and histograms take labels (e.g. stage="profile") and are
+    exported as JSON or Prometheus text; spans, one per timed call with
+    its URL, are only kept when tracing is on.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}  # Key -> [count per bucket (last is +Inf), sum, count]
+        self.spans = []
+        self.tracing = False
+
+    @staticmethod
+    def key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def incr(self, name, amount=1, **labels):
+        key = self.key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, seconds, **labels):
+        key = self.key(name, labels)
+        bucket = next((i for i, bound in enumerate(HISTOGRAM_BUCKETS) if seconds <= bound), len(HISTOGRAM_BUCKETS))
+        with self.lock:
+            histogram = self.histograms.setdefault(key, [[0] * (len(HISTOGRAM_BUCKETS) + 1), 0.0, 0])
+            histogram[0][bucket] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+
+    @contextmanager
+    def timer(self, name, url=None, **labels):
+        """Time the block into a histogram (and a span when tracing), even if it raises"""
+        wall_started = time.time()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.observe(name, elapsed, **labels)
+            if self.tracing:
+                span = {"name": name, "start": wall_started, "seconds": elapsed,
+                        "thread": threading.current_thread().name, **labels}
+                if url:
+                    span["url"] = url
+                with self.lock:
+                    if len(self.spans) < MAX_SPANS:
+                        self.spans.append(span)
+
+    def timed(self, name, **labels):
+        """Decorator form of timer()"""
+        def decorate(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    @staticmethod
+    def label_text(labels):
+        return "{" + ",".join(f'{label}="{value}"' for label, value in labels) + "}" if labels else ""
+
+    def snapshot(self):
+        """Counters keyed name{label="value"}"""
+        with self.lock:
+            return {name + self.label_text(labels): value for (name, labels), value in self.counters.items()}
+
+    def to_json(self):
+        with self.lock:
+            histograms = {}
+            for (name, labels), (buckets, total, count) in self.histograms.items():
+                histograms[name + self.label_text(labels)] = {
+                    "count": count, "sum": round(total, 6), "mean": round(total / count, 6),
+                    "p50": self.quantile(buckets, count, 0.5), "p99": self.quantile(buckets, count, 0.99),
+                    "buckets": dict(zip([str(bound) for bound in HISTOGRAM_BUCKETS] + ["+Inf"], buckets)),
+                }
+            spans = list(self.spans)
+        return {"counters": self.snapshot(), "histograms": histograms, "spans": spans}
+
+    @staticmethod
+    def quantile(buckets, count, q):
+        """Upper bound of the bucket holding the q-th observation (None if it's past the last bound)"""
+        seen = 0
+        for bound, bucket_count in zip(HISTOGRAM_BUCKETS, buckets):
+            seen += bucket_count
+            if seen >= q * count:
+                return bound
+        return None
+
+    def to_prometheus(self):
+        """Prometheus text exposition format; names get a scraper_ prefix and dots become underscores"""
+        def metric_name(name):
+            return "scraper_" + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+        lines = []
+        with self.lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                if f"# TYPE {metric_name(name)}_total counter" not in lines:
+                    lines.append(f"# TYPE {metric_name(name)}_total counter")
+                lines.append(f"{metric_name(name)}_total{self.label_text(labels)} {value}")
+            for (name, labels), (buckets, total, count) in sorted(self.histograms.items()):
+                if f"# TYPE {metric_name(name)} histogram" not in lines:
+                    lines.append(f"# TYPE {metric_name(name)} histogram")
+                cumulative = 0
+                for bound, bucket_count in zip([str(bound) for bound in HISTOGRAM_BUCKETS] + ["+Inf"], buckets):
+                    cumulative += bucket_count
+                    lines.append(f"{metric_name(name)}_bucket{self.label_text(labels + (('le', bound),))} {cumulative}")
+                lines.append(f"{metric_name(name)}_sum{self.label_text(labels)} {total}")
+                lines.append(f"{metric_name(name)}_count{self.label_text(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        """Write to path: Prometheus text for .prom/.txt, JSON otherwise"""
+        with open(path, 'w', encoding='utf-8') as f:
+            if path.endswith((".prom", ".txt")):
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.to_json(), f, indent=2, sort_keys=True)
+
+def serve_metrics(port):
+    """Serve the metrics in Prometheus text format at /metrics while the crawl runs"""
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            body = metrics.to_prometheus().encode('utf-8')
+            self.send_response(200 if self.path == "/metrics" else 404)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((METRICS_HOST, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"📊 Metrics at http://{METRICS_HOST}:{port}/metrics")
+    return server
+
+metrics = Metrics()
+
+def log_verbose(message):
+    """Per-profile chatter costs I/O on the hot path, so it's only printed with --verbose"""
+    if VERBOSE:
+        print(message)
+
+# --- Adaptive Rate Limiter ---
+class TokenBucket:
+    """Token bucket for one host whose refill rate adapts AIMD-style.
+
+    Healthy responses add RATE_INCREASE to the rate; 429s, 5xx and failed
+    connections multiply it by RATE_DECREASE (at most once per second, so a
+    burst of in-flight failures doesn't collapse it); slow responses trim it.
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = float(RATE_BURST)
+        self.updated = time.monotonic()
+        self.last_decrease = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token and return how long to wait until it is really available"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(RATE_BURST, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Going negative queues the caller behind everyone already waiting
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def observe(self, status, latency):
+        with self.lock:
+            now = time.monotonic()
+            if status is None or status == 429 or status >= 500:
+                if now - self.last_decrease >= 1.0:
+                    self.rate = max(MIN_REQUESTS_PER_SECOND, self.rate * RATE_DECREASE)
+                    self.last_decrease = now
+            elif latency > SLOW_RESPONSE_SECONDS:
+                self.rate = max(MIN_REQUESTS_PER_SECOND, self.rate * 0.9)
+            else:
+                self.rate = min(MAX_REQUESTS_PER_SECOND, self.rate + RATE_INCREASE)
+
+class RateLimiter:
+    """One adaptive token bucket per host, shared by every worker and engine"""
+
+    def __init__(self, requests_per_second):
+        self.requests_per_second = requests_per_second
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.requests_per_second)
+            return self.buckets[host]
+
+    def wait(self, url):
+        delay = self.bucket(url).reserve()
+        if delay > 0:
+            metrics.observe("rate_limit_wait_seconds", delay)
+            time.sleep(delay)
+
+    async def wait_async(self, url):
+        delay = self.bucket(url).reserve()
+        if delay > 0:
+            metrics.observe("rate_limit_wait_seconds", delay)
+            await asyncio.sleep(delay)
+
+    def observe(self, url, status, latency):
+        """Feed a response back; status is None when no response came back at all"""
+        metrics.incr("responses", status=str(status) if status else "none")
+        metrics.observe("request_seconds", latency)
+        if status == 429:
+            metrics.incr("rate_limiter.throttled")
+        elif status is None or status >= 500:
+            metrics.incr("rate_limiter.server_errors")
+        self.bucket(url).observe(status, latency)
+
+    def rates(self):
+        with self.lock:
+            return {host: round(bucket.rate, 2) for host, bucket in self.buckets.items()}
+
+rate_limiter = RateLimiter(REQUESTS_PER_SECOND)
+
+# --- Profiling ---
+class StackSampler:
+    """Statistical profiler: snapshots every other thread's stack at a fixed interval.
+
+    Nothing is traced, the crawl's threads are only looked at, so the cost
+    is one stack walk per thread per interval and it can stay on in production.
+    """
+
+    # A thread whose top frame is in one of these is parked waiting for work, not doing any
+    IDLE_FILES = {"threading.py", "queue.py", "selectors.py", "thread.py"}
+
+    def __init__(self, interval=PROFILE_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples = 0
+        self.idle_samples = 0
+        self.own_counts = Counter()  # Function at the top of the stack
+        self.inclusive_counts = Counter()  # Function anywhere on the stack
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True, name="stack-sampler")
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        own_thread = threading.get_ident()
+        while not self.stopped.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                if os.path.basename(frame.f_code.co_filename) in self.IDLE_FILES:
+                    self.idle_samples += 1
+                    continue
+                self.samples += 1
+                self.own_counts[self.describe(frame.f_code)] += 1
+                seen = set()
+                while frame is not None:
+                    name = self.describe(frame.f_code)
+                    if name not in seen:
+                        seen.add(name)
+                        self.inclusive_counts[name] += 1
+                    frame = frame.f_back
+
+    @staticmethod
+    def describe(code):
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class RunProfiler:
+    """--profile: per-stage breakdown from the metrics timers, the stack sampler,
+    and optionally cProfile on a random share of profile pages.
+
+    cProfile runs on one page at a time; pages that come up while it is busy
+    go unprofiled rather than waiting.
+    """
+
+    def __init__(self, cprofile_rate=0.0):
+        self.sampler = StackSampler()
+        self.cprofile_rate = cprofile_rate
+        self.cprofile_lock = threading.Lock()
+        self.cprofile_stats = None
+        self.cprofiled_pages = 0
+        self.started = None
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.sampler.start()
+
+    def stop(self):
+        self.sampler.stop()
+        return time.perf_counter() - self.started
+
+    @contextmanager
+    def profile_page(self):
+        if random.random() >= self.cprofile_rate or not self.cprofile_lock.acquire(blocking=False):
+            yield
+            return
+        try:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                if self.cprofile_stats is None:
+                    self.cprofile_stats = pstats.Stats(profiler)
+                else:
+                    self.cprofile_stats.add(profiler)
+                self.cprofiled_pages += 1
+        finally:
+            self.cprofile_lock.release()
+
+    def report(self, wall_seconds):
+        lines = [f"Wall time: {wall_seconds:.2f}s. Stages overlap when workers run in parallel, "
+                 f"so their totals can add up to more than that.", "",
+                 f"{'stage':<40} {'calls':>8} {'total s':>10} {'mean ms':>10} {'x wall':>8}"]
+        with metrics.lock:
+            histograms = sorted(metrics.histograms.items(), key=lambda item: -item[1][1])
+        for (name, labels), (_, total, count) in histograms:
+            lines.append(f"{name + Metrics.label_text(labels):<40} {count:>8} {total:>10.2f} "
+                         f"{total / count * 1000:>10.2f} {total / wall_seconds:>8.2f}")
+
+        sampler = self.sampler
+        lines += ["", f"Sampled stacks: {sampler.samples} busy samples every {sampler.interval * 1000:.0f}ms "
+                      f"({sampler.idle_samples} more from idle threads waiting for work left out)"]
+        for title, counts in [("own time", sampler.own_counts), ("inclusive time", sampler.inclusive_counts)]:
+            lines += ["", f"Top functions by {title}:"]
+            for name, count in counts.most_common(PROFILE_TOP):
+                lines.append(f"{count / max(1, sampler.samples):>7.1%}  {name}")
+
+        if self.cprofile_stats is not None:
+            lines += ["", f"cProfile of {self.cprofiled_pages} profile pages (by cumulative time):"]
+            stream = io.StringIO()
+            self.cprofile_stats.stream = stream
+            self.cprofile_stats.sort_stats("cumulative").print_stats(PROFILE_TOP)
+            lines.append(stream.getvalue())
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, path, wall_seconds):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.report(wall_seconds))
+        if self.cprofile_stats is not None:
+            self.cprofile_stats.dump_stats(os.path.splitext(path)[0] + ".pstats")
+
+run_profiler = None
+
+def profiled_page():
+    """cProfile this profile page if --profile-cprofile picked it"""
+    return run_profiler.profile_page() if run_profiler else nullcontext()
+
+# --- HTML Parser Backends ---
+class SoupNode:
+    """Node in a BeautifulSoup tree (html.parser or lxml tree builder)"""
+
+    def __init__(self, tag):
+        self.tag = tag
+
+    def select(self, css):
+        return [SoupNode(tag) for tag in self.tag.select(css)]
+
+    def select_one(self, css):
+        tag = self.tag.select_one(css)
+        return SoupNode(tag) if tag is not None else None
+
+    def text(self, strip=True):
+        return self.tag.get_text(strip=strip)
+
+    def attr(self, name):
+        return self.tag.get(name)
+
+    def has_class(self, name):
+        return name in self.tag.get('class', [])
+
+    def is_inside(self, other):
+        return any(parent is other.tag for parent in self.tag.parents)
+
+class LexborNode:
+    """Node in a selectolax (lexbor) tree"""
+
+    def __init__(self, node):
+        self.node = node
+
+    def select(self, css):
+        return [LexborNode(node) for node in self.node.css(css)]
+
+    def select_one(self, css):
+        node = self.node.css_first(css)
+        return LexborNode(node) if node is not None else None
+
+    def text(self, strip=True):
+        return self.node.text(strip=strip)
+
+    def attr(self, name):
+        return self.node.attributes.get(name)
+
+    def has_class(self, name):
+        return name in (self.node.attributes.get('class') or '').split()
+
+    def is_inside(self, other):
+        parent = self.node.parent
+        while parent is not None:
+            if parent == other.node:
+                return True
+            parent = parent.parent
+        return False
+
+def use_parser_backend(name):
+    """Switch the backend used by parse_html for the rest of the run"""
+    global PARSER_BACKEND
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend: {name!r} (expected one of {PARSER_BACKENDS})")
+    if name == "lxml" and lxml is None:
+        raise RuntimeError("The lxml parser backend needs lxml: pip install lxml")
+    if name == "selectolax" and LexborHTMLParser is None:
+        raise RuntimeError("The selectolax parser backend needs selectolax: pip install selectolax")
+    PARSER_BACKEND = name
+
+@metrics.timed("build_tree_seconds")
+def parse_html(html, backend=None, parse_only=None):
+    """Parse a page with the selected backend and return its root node.
+
+    parse_only is a SoupStrainer honoured by the BeautifulSoup backends;
+    selectolax always builds the whole tree, which is cheap enough there.
+    """
+    backend = backend or PARSER_BACKEND
+    if backend == "selectolax":
+        return LexborNode(LexborHTMLParser(html).root)
+    return SoupNode(BeautifulSoup(html, backend, parse_only=parse_only))
+
+# --- Partial Parsing ---
+LIST_PAGE_STRAINER = SoupStrainer('div', class_='company')
+# Matched on the raw HTML, so attribute quoting, spacing and other class tokens can vary
+PROFILE_NAME_PATTERN = re.compile(r"""\bid\s*=\s*["']?company_name(?![\w-])""", re.IGNORECASE)
+PROFILE_FIELD_PATTERN = re.compile(r"""\bid\s*=\s*["']?company_(?:name|address)(?![\w-])""", re.IGNORECASE)
+PROFILE_INFO_PATTERN = re.compile(r"""\bclass\s*=\s*["']?[^"'>]*?(?<![\w-])(?:extra_)?info(?![\w-])""", re.IGNORECASE)
+
+def profile_region(html):
+    """Slice a profile page down to the part from the first field we read onwards.
+
+    Everything before #company_name or #company_address, whichever comes
+    first (head, scripts, navigation), is skipped. Returns None when the
+    page doesn't look the way we expect, e.g. the company name is missing
+    or an info block comes before the slice would start.
+    """
+    if not PROFILE_NAME_PATTERN.search(html):
+        return None
+    start = html.rfind('<', 0, PROFILE_FIELD_PATTERN.search(html).start())
+    if start == -1:
+        return None
+
+    if PROFILE_INFO_PATTERN.search(html, 0, start):
+        return None
+    return html[start:]
+
+
+# --- On-disk HTTP Response Cache ---
+class ResponseCache:
+    """Response bodies on disk keyed by URL, revalidated with ETag/Last-Modified.
+
+    Each entry is one file: a JSON metadata line followed by the raw body,
+    replaced atomically so concurrent workers never see a half-written entry.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, url):
+        return os.path.join(self.directory, hashlib.sha256(url.encode('utf-8')).hexdigest())
+
+    def lookup(self, url):
+        try:
+            with open(self.path_for(url), 'rb') as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url:
+            return None
+        meta["body"] = body
+        return meta
+
+    @staticmethod
+    def conditional_headers(entry):
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url, headers, body):
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return  # Nothing to revalidate with next time
+
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_type": headers.get("Content-Type"),
+        }
+        path = self.path_for(url)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(json.dumps(meta).encode('utf-8') + b"\n")
+            f.write(body)
+        os.replace(tmp_path, path)
+        metrics.incr("http_cache.stores")
+
+class CachingAdapter(HTTPAdapter):
+    """HTTPAdapter that sends conditional GETs and serves 304s from the cache"""
+
+    def __init__(self, cache, *args, **kwargs):
+        self.cache = cache
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if request.method != "GET":
+            return super().send(request, **kwargs)
+
+        entry = self.cache.lookup(request.url)
+        request.headers.update(self.cache.conditional_headers(entry))
+        response = super().send(request, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            metrics.incr("http_cache.hits")
+            response.content  # Drain the empty 304 body so the connection is released
+            response.status_code = 200
+            response.reason = "OK"
+            response._content = entry["body"]
+            if entry.get("content_type"):
+                response.headers["Content-Type"] = entry["content_type"]
+            response.from_cache = True
+        # Fresh 200s are stored by fetch() once it has read the (size-limited) body
+        return response
+
+response_cache = None
+
+def enable_http_cache(directory=HTTP_CACHE_DIR):
+    """Put the on-disk cache under the shared session (and the async engine)"""
+    global response_cache
+    response_cache = ResponseCache(directory)
+    configure_http_client(session_pool_size, HTTP2)
+    print(f"🗄️ HTTP cache: {directory}")
+
+# --- Shared HTTP Client ---
+# Retries happen in fetch(), where they can see status codes, honour
+# Retry-After and go back through the rate limiter
+retry_strategy = Retry(total=0, read=False)
+
+def build_session(pool_size, http2=False):
+    """HTTP client with a connection pool sized for pool_size concurrent requests.
+
+    requests keeps connections alive by default; pool_block makes extra
+    threads wait for a free connection instead of opening throwaway ones.
+    """
+    if http2:
+        if httpx is None:
+            raise RuntimeError("HTTP/2 needs httpx: pip install 'httpx[http2]'")
+        if response_cache is not None:
+            raise RuntimeError("The response cache works with the requests client only; drop --http2 or --cache")
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size,
+                              keepalive_expiry=KEEPALIVE_SECONDS)
+        return httpx.Client(http2=True, limits=limits, follow_redirects=True)
+
+    client = requests.Session()
+    adapter_options = dict(pool_connections=POOL_HOSTS, pool_maxsize=pool_size, pool_block=True,
+                           max_retries=retry_strategy)
+    if response_cache is not None:
+        adapter = CachingAdapter(response_cache, **adapter_options)
+    else:
+        adapter = HTTPAdapter(**adapter_options)
+    client.mount("https://", adapter)
+    client.mount("http://", adapter)
+    return client
+
+def configure_http_client(pool_size, http2=False):
+    """Swap in a client sized for this run's concurrency"""
+    global session, session_pool_size, HTTP2
+    old_session = session
+    session = build_session(pool_size, http2)
+    session_pool_size, HTTP2 = pool_size, http2
+    old_session.close()
+
+# Workers plus the list-page / discovery fetches
+session_pool_size = MAX_WORKERS + 2
+session = build_session(session_pool_size)
+
+if httpx is not None:
+    CONNECTION_ERRORS = (requests.ConnectionError, requests.Timeout, httpx.TransportError)
+    CLIENT_ERRORS = (requests.RequestException, httpx.TransportError)
+else:
+    CONNECTION_ERRORS = (requests.ConnectionError, requests.Timeout)
+    CLIENT_ERRORS = (requests.RequestException,)
+
+# --- Retry Policy ---
+class RetryableStatus(Exception):
+    """The server answered with a status worth trying again (429, 5xx)"""
+
+    def __init__(self, url, status, retry_after=None):
+        super().__init__(f"HTTP {status}")
+        self.url = url
+        self.status = status
+        self.retry_after = retry_after
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+def retry_delay(attempt, retry_after=None):
+    """Honour Retry-After when given, else exponential backoff; both with jitter"""
+    if retry_after is not None:
+        return min(RETRY_MAX_DELAY, retry_after + random.uniform(0, 1))
+    # "Full jitter": spread retries over the whole window so workers don't retry in lockstep
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BACKOFF * 2 ** attempt))
+
+def log_retry(url, error, attempt, delay):
+    metrics.incr("retries")
+    print(f"    🔁 Retry {attempt + 1}/{RETRY_ATTEMPTS} for {url} in {delay:.1f}s ({error})")
+
+# --- Bounded Response Reading ---
+class ResponseTooLarge(Exception):
+    """The body went over MAX_RESPONSE_BYTES"""
+
+class FetchedPage:
+    """A fully read, size-checked response body and the charset to decode it with"""
+
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = response_charset(headers) or DEFAULT_ENCODING
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors='replace')
+
+CHARSET_PATTERN = re.compile(r'charset=["\']?([\w.:-]+)', re.IGNORECASE)
+
+def response_charset(headers):
+    """Charset named in Content-Type, if it is one Python knows"""
+    match = CHARSET_PATTERN.search(headers.get("Content-Type") or "")
+    if not match:
+        return None
+    try:
+        return codecs.lookup(match.group(1)).name
+    except LookupError:
+        return None
+
+def check_declared_size(url, headers):
+    declared = headers.get("Content-Length")
+    if declared and declared.isdigit() and int(declared) > MAX_RESPONSE_BYTES:
+        raise ResponseTooLarge(f"{url} declares {declared} bytes (limit {MAX_RESPONSE_BYTES})")
+
+def read_limited(url, headers, chunks):
+    """Join decompressed body chunks, giving up as soon as the limit is passed"""
+    check_declared_size(url, headers)
+    body = bytearray()
+    for chunk in chunks:
+        body += chunk
+        if len(body) > MAX_RESPONSE_BYTES:
+            raise ResponseTooLarge(f"{url} is larger than {MAX_RESPONSE_BYTES} bytes")
+    return bytes(body)
+
+# --- Fetch through the shared session ---
+def fetch(url):
+    with metrics.timer("fetch_seconds", url=url):  # Retries and rate limiting included
+        for attempt in range(RETRY_ATTEMPTS + 1):
+            try:
+                return fetch_once(url)
+            except (RetryableStatus,) + CONNECTION_ERRORS as e:
+                if attempt == RETRY_ATTEMPTS:
+                    raise
+                delay = retry_delay(attempt, getattr(e, "retry_after", None))
+                log_retry(url, e, attempt, delay)
+                time.sleep(delay)
+
+def fetch_once(url):
+    """One GET, streamed and size-limited; returns a FetchedPage"""
+    rate_limiter.wait(url)
+    started = time.monotonic()
+    status = None
+    try:
+        if HTTP2:
+            request = session.stream("GET", url, headers=HEADERS, timeout=15)
+        else:
+            request = session.get(url, headers=HEADERS, timeout=15, stream=True)
+
+        with request as res:
+            status = res.status_code
+            rate_limiter.observe(url, status, time.monotonic() - started)
+            if status in RETRY_STATUSES:
+                raise RetryableStatus(url, status, parse_retry_after(res.headers.get("Retry-After")))
+            res.raise_for_status()
+
+            chunks = res.iter_bytes(READ_CHUNK_BYTES) if HTTP2 else res.iter_content(READ_CHUNK_BYTES)
+            page = FetchedPage(url, status, res.headers, read_limited(url, res.headers, chunks))
+            from_cache = getattr(res, "from_cache", False)
+    except CLIENT_ERRORS:
+        if status is None:
+            rate_limiter.observe(url, None, time.monotonic() - started)
+        raise
+
+    if response_cache is not None and status == 200 and not from_cache:
+        metrics.incr("http_cache.misses")
+        response_cache.store(url, page.headers, page.content)
+    return page
+
+async def fetch_async(client, url):
+    with metrics.timer("fetch_seconds", url=url):
+        for attempt in range(RETRY_ATTEMPTS + 1):
+            try:
+                return await fetch_async_once(client, url)
+            except (RetryableStatus, aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == RETRY_ATTEMPTS:
+                    raise
+                delay = retry_delay(attempt, getattr(e, "retry_after", None))
+                log_retry(url, e, attempt, delay)
+                await asyncio.sleep(delay)
+
+async def fetch_async_once(client, url):
+    """One GET, streamed and size-limited; returns the decoded body"""
+    await rate_limiter.wait_async(url)
+    entry = response_cache.lookup(url) if response_cache else None
+    headers = {**HEADERS, **ResponseCache.conditional_headers(entry)}
+
+    started = time.monotonic()
+    status = None
+    try:
+        async with client.get(url, headers=headers) as res:
+            status = res.status
+            rate_limiter.observe(url, status, time.monotonic() - started)
+
+            if res.status == 304 and entry is not None:
+                metrics.incr("http_cache.hits")
+                charset = response_charset({"Content-Type": entry.get("content_type")})
+                return entry["body"].decode(charset or DEFAULT_ENCODING, errors='replace')
+
+            if res.status in RETRY_STATUSES:
+                raise RetryableStatus(url, res.status, parse_retry_after(res.headers.get("Retry-After")))
+            res.raise_for_status()
+
+            check_declared_size(url, res.headers)
+            body = bytearray()
+            async for chunk in res.content.iter_chunked(READ_CHUNK_BYTES):
+                body += chunk
+                if len(body) > MAX_RESPONSE_BYTES:
+                    raise ResponseTooLarge(f"{url} is larger than {MAX_RESPONSE_BYTES} bytes")
+            page = FetchedPage(url, status, res.headers, bytes(body))
+    except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+        if status is None:
+            rate_limiter.observe(url, None, time.monotonic() - started)
+        raise
+
+    if response_cache is not None:
+        metrics.incr("http_cache.misses")
+        response_cache.store(url, page.headers, page.content)
+    return page.text
+
+# --- Dead-letter Queue ---
+class DeadLetterQueue:
+    """Profiles that failed even after retries, re-attempted at the end of the run.
+
+    Each failure is also journaled, so a crash before the end of the run
+    doesn't lose the profiles that failed on pages already marked done.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.failures = {}
+
+    def add(self, url, error):
+        message = f"{type(error).__name__}: {error}"
+        with self.lock:
+            self.failures[url] = message
+        if crawl_journal:
+            crawl_journal.record_dead_letter(url, message)
+        metrics.incr("dead_letters")
+
+    def restore(self, failures):
+        """Put back failures loaded from the journal of a crashed crawl"""
+        with self.lock:
+            self.failures.update(failures)
+
+    def drain(self):
+        with self.lock:
+            failures, self.failures = self.failures, {}
+        return failures
+
+dead_letters = DeadLetterQueue()
+
+def retry_dead_letters(writer, category_url, retry=True):
+    """Give failed profiles one more go and record the ones that still fail"""
+    failures = dead_letters.drain()
+    if crawl_journal:
+        # Fetched fine when a page that was still unfinished at the crash was crawled again
+        failures = {url: error for url, error in failures.items() if url not in crawl_journal.written_urls}
+    dead_letter_csv = category_file(DEAD_LETTER_CSV, category_url)
+    if not failures:
+        if os.path.exists(dead_letter_csv):
+            os.remove(dead_letter_csv)  # Left over from an earlier run
+        return 0
+
+    rows = []
+    if retry:
+        print(f"\n🔁 Re-attempting {len(failures)} failed profiles")
+        for url in list(failures):
+            data = extract_from_profile(url)
+            if data and data.get("Company Name") != "-":
+                rows.append(data)
+                del failures[url]
+        failures.update(dead_letters.drain())
+
+    if crawl_journal:
+        rows = crawl_journal.unwritten(rows)
+    writer.write(rows)
+    writer.end_page("dead-letter", [row["Profile URL"] for row in rows])
+    if retry:
+        print(f"🔁 Recovered {len(rows)} profiles on the final retry")
+
+    with open(dead_letter_csv, 'w', newline='', encoding='utf-8') as dead_f:
+        dead_writer = csv.writer(dead_f)
+        dead_writer.writerow(["Profile URL", "Error"])
+        dead_writer.writerows(sorted(failures.items()))
+    if failures:
+        print(f"☠️ {len(failures)} profiles still failing, listed in: {dead_letter_csv}")
+    return len(rows)
 
 # --- Extract from Profile Page ---
 def extract_from_profile(url):
     try:
-        print(f"    Fetching profile: {url}")
-        res = session.get(url, headers=HEADERS, timeout=15)
-        res.raise_for_status()
-        soup = BeautifulSoup(res.text, 'html.parser')
-
-        # Check pagination info on first page
-        if "page/1" in url or url.endswith("/category/car-rental"):
-            check_pagination_info(soup)
-
-        # Helper function to extract info by label
-        def find_info_by_label(label_text):
-            info_divs = soup.find_all('div', class_='info')
-            for info_div in info_divs:
-                label_div = info_div.find('div', class_='label')
-                if label_div and label_div.get_text(strip=True).lower() == label_text.lower():
-                    text_div = info_div.find('div', class_='text')
-                    if text_div:
-                        # Handle different text structures
-                        if text_div.find('a'):
-                            return text_div.find('a').get_text(strip=True)
-                        else:
-                            return text_div.get_text(strip=True)
-            return "-"
-
-        # Extract company name
-        company_name_elem = soup.find('div', id='company_name')
-        company_name = company_name_elem.get_text(strip=True) if company_name_elem else "-"
-
-        # Extract address
-        address_elem = soup.find('div', id='company_address')
-        address = address_elem.get_text(strip=True) if address_elem else "-"
-
-        # Extract other information using the helper function
-        contact_number = find_info_by_label("Contact number")
-        mobile_phone = find_info_by_label("Mobile phone")
-        website_address = find_info_by_label("Website address")
-
-        # Extract company manager from extra_info section
-        company_manager = "-"
-        extra_info = soup.find('div', class_='extra_info')
-        if extra_info:
-            info_divs = extra_info.find_all('div', class_='info')
-            for info_div in info_divs:
-                label_div = info_div.find('div', class_='label')
-                if label_div and label_div.get_text(strip=True).lower() == "company manager":
-                    # Company manager text is directly after the label div
-                    company_manager = info_div.get_text(strip=True).replace("Company manager", "").strip()
-                    break
+        log_verbose(f"    Fetching profile: {url}")
+        with profiled_page():
+            res = fetch(url)
+            return parse_profile_pooled(res.content, res.encoding, url)
 
-        return {
-            "Company Name": company_name,
-            "Address": address,
-            "Contact Number": contact_number,
-            "Mobile Phone": mobile_phone,
-            "Website Address": website_address,
-            "Company Manager": company_manager,
-            "Profile URL": url
-        }
+    except Exception as e:
+        metrics.incr("errors", stage="profile", type=type(e).__name__)
+        print(f"    ⚠️ Error scraping profile {url}: {e}")
+        dead_letters.add(url, e)
+        return {}
+
+async def extract_from_profile_async(client, url):
+    try:
+        log_verbose(f"    Fetching profile: {url}")
+        html = await fetch_async(client, url)
+        if parse_pool is not None:
+            return await parse_profile_pooled_async(html, url)
+        # Only the parse is profiled: across an await cProfile would also catch the other tasks
+        with profiled_page():
+            return parse_profile(html, url)
 
     except Exception as e:
+        metrics.incr("errors", stage="profile", type=type(e).__name__)
         print(f"    ⚠️ Error scraping profile {url}: {e}")
+        dead_letters.add(url, e)
         return {}
 
-# --- Check pagination info ---
-def check_pagination_info(soup):
-    """Check pagination information to understand total pages/results"""
+# --- Parse Profile Page ---
+@metrics.timed("parse_seconds", page="profile")
+def parse_profile(html, url, backend=None):
+    """Extract the listing fields from a profile page's HTML"""
+    region = profile_region(html) if PARTIAL_PARSING else None
+    soup = parse_html(region if region is not None else html, backend)
+
+    # Extract company name
+    company_name_elem = soup.select_one('div#company_name')
+    company_name = company_name_elem.text() if company_name_elem else "-"
+
+    # Extract address
+    address_elem = soup.select_one('div#company_address')
+    address = address_elem.text() if address_elem else "-"
+
+    # Extract the labelled fields from a single pass over the info blocks
+    labels = index_info_blocks(soup)
+    contact_number = labels.get("contact number", "-")
+    mobile_phone = labels.get("mobile phone", "-")
+    website_address = labels.get("website address", "-")
+    company_manager = labels.get("company manager", "-")
+
+    return {
+        "Company Name": company_name,
+        "Address": address,
+        "Contact Number": contact_number,
+        "Mobile Phone": mobile_phone,
+        "Website Address": website_address,
+        "Company Manager": company_manager,
+        "Profile URL": url
+    }
+
+# --- Index Profile Info Blocks ---
+@metrics.timed("extract_fields_seconds")
+def index_info_blocks(soup):
+    """Walk every div.info once and map its lowercased label to its value.
+
+    The first block wins for each label, matching a top-to-bottom search.
+    "company manager" is only taken from the extra_info section, where the
+    value is the block's own text rather than a div.text child.
+    """
+    extra_info = soup.select_one('div.extra_info')
+    labels = {}
+
+    for info_div in soup.select('div.info'):
+        label_div = info_div.select_one('div.label')
+        if not label_div:
+            continue
+        label = label_div.text().lower()
+
+        if label == "company manager":
+            if label not in labels and extra_info is not None and info_div.is_inside(extra_info):
+                # Company manager text is directly after the label div
+                labels[label] = info_div.text().replace("Company manager", "").strip()
+            continue
+
+        if label in labels:
+            continue
+        text_div = info_div.select_one('div.text')
+        if text_div:
+            # Handle different text structures
+            link = text_div.select_one('a')
+            labels[label] = link.text() if link else text_div.text()
+
+    return labels
+
+# --- Parse Process Pool ---
+def init_parse_worker(backend, partial):
+    """Runs once in each pool process so it parses the way the parent would"""
+    global PARTIAL_PARSING
+    use_parser_backend(backend)
+    PARTIAL_PARSING = partial
+
+def parse_profile_row(content, encoding, url):
+    """Pool task: parse a fetched profile page; returns the fields as a tuple in FIELDNAMES order"""
+    html = content.decode(encoding, errors='replace') if isinstance(content, bytes) else content
+    row = parse_profile(html, url)
+    return tuple(row[name] for name in FIELDNAMES)
+
+def start_parse_pool(processes):
+    """Parse profiles in worker processes, so parsing isn't held to one core by the GIL.
+
+    Workers are spawned rather than forked: forking while the crawl's
+    threads hold locks can leave a child deadlocked.
+    """
+    global parse_pool
+    parse_pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=init_parse_worker, initargs=(PARSER_BACKEND, PARTIAL_PARSING))
+    print(f"🧩 Parsing profiles in {processes} processes")
+
+def stop_parse_pool():
+    global parse_pool
+    if parse_pool:
+        parse_pool.shutdown()
+        parse_pool = None
+
+parse_pool = None
+
+def parse_profile_pooled(content, encoding, url):
+    """Parse in the pool when there is one (blocking this thread only), else right here"""
+    if parse_pool is None:
+        return parse_profile(content.decode(encoding, errors='replace'), url)
+    with metrics.timer("parse_pool_seconds"):
+        return dict(zip(FIELDNAMES, parse_pool.submit(parse_profile_row, content, encoding, url).result()))
+
+async def parse_profile_pooled_async(html, url):
+    """Hand the parse to the pool without blocking the event loop"""
+    with metrics.timer("parse_pool_seconds"):
+        loop = asyncio.get_running_loop()
+        values = await loop.run_in_executor(parse_pool, parse_profile_row, html, None, url)
+    return dict(zip(FIELDNAMES, values))
+
+# --- Pagination Discovery ---
+RESULT_COUNT_PATTERN = re.compile(r'(\d[\d,]*)\s+results?\b', re.IGNORECASE)
+
+@metrics.timed("parse_seconds", page="pagination")
+def parse_pagination(html, backend=None):
+    """Return (total_pages, result_count) from a category page.
+
+    Pages come from the div.scroller_with_ul pager links; the result count
+    is read straight from the markup and is None when the page doesn't show one.
+    """
+    soup = parse_html(html, backend)
+    page_links = soup.select('div.scroller_with_ul li a.pages_no')
+    page_numbers = [int(link.text()) for link in page_links if link.text().isdigit()]
+    total_pages = max(page_numbers) if page_numbers else None
+
+    match = RESULT_COUNT_PATTERN.search(html)
+    result_count = int(match.group(1).replace(",", "")) if match else None
+    return total_pages, result_count
+
+def get_total_pages(category_url=CATEGORY_URL):
+    """Fetch the first category page once and work out how many pages to crawl.
+
+    Returns (total pages, result count, first page HTML); the page loops
+    reuse the HTML instead of fetching page 1 again. It is None if the
+    fetch failed, and the loops then try page 1 themselves.
+    """
+    first_page_html = None
     try:
-        # Look for pagination info
-        pagination_info = soup.select('.pagination, .pager, .results-info')
-        if pagination_info:
-            print(f"  Pagination info found: {pagination_info[0].get_text(strip=True)}")
-
-        # Look for total results count
-        results_text = soup.get_text()
-        if "results" in results_text.lower():
-            lines = results_text.split('\n')
-            for line in lines:
-                if "result" in line.lower() and any(char.isdigit() for char in line):
-                    print(f"  Results info: {line.strip()}")
-                    break
+        first_page_html = fetch(category_url).text
+        total_pages, result_count = parse_pagination(first_page_html)
     except Exception as e:
-        print(f"  Could not extract pagination info: {e}")
+        print(f"❌ Error detecting total pages: {e}")
+        total_pages, result_count = None, None
+
+    if total_pages:
+        print(f"📄 Total pages detected: {total_pages}")
+    else:
+        total_pages = MAX_PAGES
+        print(f"⚠️ No pagination found, crawling up to {MAX_PAGES} pages until one comes back empty")
+    if result_count is not None:
+        print(f"📄 Results listed: {result_count}")
+    return total_pages, result_count, first_page_html
+
+# --- Parse List Page ---
+def parse_list_page(html, backend=None):
+    """Return the profile URLs of the companies listed on a category page"""
+    return [profile_url for profile_url, _ in parse_list_entries(html, backend)]
+
+@metrics.timed("parse_seconds", page="list")
+def parse_list_entries(html, backend=None):
+    """Return (profile URL, snippet fingerprint) for each company on a category page"""
+    soup = parse_html(html, backend, parse_only=LIST_PAGE_STRAINER if PARTIAL_PARSING else None)
+
+    # One selection per page; g_0 blocks are the listings (with or without image)
+    blocks = soup.select('div.company')
+    if not blocks and PARTIAL_PARSING:
+        # Nothing in the strained tree: look at the whole page before giving up
+        soup = parse_html(html, backend)
+        blocks = soup.select('div.company')
+    companies = [block for block in blocks if block.has_class('g_0')]
+    log_verbose(f"  Found {len(companies)} companies on this page")
+
+    if DIAGNOSTICS:
+        record_list_page_diagnostics(soup, blocks, companies)
+
+    if len(companies) == 0:
+        print("  No companies found - might have reached end of pages")
+        return []
+
+    entries = []
+    for i, company in enumerate(companies, 1):
+        try:
+            # Extract profile URL
+            name_tag = company.select_one('h3 a')
+            if name_tag and name_tag.attr('href'):
+                fingerprint = hashlib.sha1(company.text().encode('utf-8')).hexdigest()
+                entries.append((BASE_URL + name_tag.attr('href'), fingerprint))
+                log_verbose(f"  [{i}/{len(companies)}] Queued: {name_tag.text()}")
+            else:
+                metrics.incr("errors", stage="list_entry", type="MissingProfileUrl")
+                print(f"  ⚠️ No profile URL found for company {i}")
+
+        except Exception as e:
+            metrics.incr("errors", stage="list_entry", type=type(e).__name__)
+            print(f"  ⚠️ Error processing company {i}: {e}")
+            continue
+
+    return entries
+
+def record_list_page_diagnostics(soup, blocks, companies):
+    """Classify a list page's company blocks into metrics counters"""
+    with_img = sum(1 for company in companies if company.has_class('with_img'))
+    metrics.incr("list_pages")
+    metrics.incr("list_pages.company_blocks", len(blocks))
+    metrics.incr("list_pages.companies_with_img", with_img)
+    metrics.incr("list_pages.companies_without_img", len(companies) - with_img)
+
+    if not companies:
+        metrics.incr("list_pages.empty")
+        # Let's check if page exists but has different structure
+        page_content = soup.text(strip=False)
+        if "No results found" in page_content or "404" in page_content:
+            metrics.incr("list_pages.no_results")
+
+def collect_listings(results):
+    """Keep the successfully extracted profiles, in list order"""
+    listings = []
+    for data in results:
+        if data and data.get("Company Name") != "-":
+            listings.append(data)
+            metrics.incr("profiles", result="extracted")
+            log_verbose(f"    ✅ Successfully extracted data for: {data['Company Name']}")
+        else:
+            metrics.incr("profiles", result="failed")
+            log_verbose(f"    ❌ Failed to extract data")
+    return listings
 
 # --- Scrape List Page and Profile ---
-def scrape_list_page(url):
+PAGE_FAILED = object()  # The list page itself couldn't be fetched; unlike None, not the end of the listing
+
+def scrape_list_page(url, max_workers=MAX_WORKERS, html=None):
     try:
-        print(f"  Fetching list page: {url}")
-        res = session.get(url, headers=HEADERS, timeout=15)
-        res.raise_for_status()
-        soup = BeautifulSoup(res.text, 'html.parser')
-
-        # Updated selector to match both with_img and without img companies
-        companies = soup.select('div.company.g_0')
-        print(f"  Found {len(companies)} companies on this page")
-
-        # Debug: Let's also check what other company classes exist
-        all_companies = soup.select('div.company')
-        print(f"  Debug: Total div.company found: {len(all_companies)}")
-
-        # Check different variations
-        with_img = soup.select('div.company.with_img.g_0')
-        without_img = soup.select('div.company.g_0:not(.with_img)')
-        print(f"  Debug: with_img.g_0: {len(with_img)}, without with_img: {len(without_img)}")
-
-        if len(companies) == 0:
-            print("  No companies found - might have reached end of pages")
-            # Let's check if page exists but has different structure
-            page_content = soup.get_text()
-            if "No results found" in page_content or "404" in page_content:
-                print("  Page indicates no results or 404")
-            return []
-
-        listings = []
-        for i, company in enumerate(companies, 1):
+        if html is None:
+            log_verbose(f"  Fetching list page: {url}")
+            html = fetch(url).text
+        profile_urls = parse_list_page(html)
+        if not profile_urls:
+            return None  # End of the listing
+        profile_urls = schedule_profiles(profile_urls)
+
+        # Fetch profiles in parallel; map() hands results back in list order
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            return collect_listings(executor.map(extract_from_profile, profile_urls))
+
+    except Exception as e:
+        metrics.incr("errors", stage="list", type=type(e).__name__)
+        print(f"  ❌ Error scraping list page {url}: {e}")
+        return PAGE_FAILED
+
+async def scrape_list_page_async(client, url, semaphore, html=None):
+    try:
+        if html is None:
+            log_verbose(f"  Fetching list page: {url}")
+            html = await fetch_async(client, url)
+        profile_urls = parse_list_page(html)
+        if not profile_urls:
+            return None  # End of the listing
+        profile_urls = schedule_profiles(profile_urls)
+
+        async def bounded_extract(profile_url):
+            async with semaphore:
+                return await extract_from_profile_async(client, profile_url)
+
+        # gather() returns results in the order the coroutines were passed
+        results = await asyncio.gather(*(bounded_extract(u) for u in profile_urls))
+        return collect_listings(results)
+
+    except Exception as e:
+        metrics.incr("errors", stage="list", type=type(e).__name__)
+        print(f"  ❌ Error scraping list page {url}: {e}")
+        return PAGE_FAILED
+
+# --- URL Frontier ---
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+def normalize_url(url):
+    """Canonical form of a URL so the same page is only scheduled once.
+
+    Lowercases scheme and host, drops default ports, fragments, duplicate
+    and trailing slashes, and sorts the query string.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{parts.port}"
+    path = re.sub(r'/{2,}', '/', parts.path)
+    if len(path) > 1:
+        path = path.rstrip('/')
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, path or '/', query, ''))
+
+class UrlFrontier:
+    """Disk-backed set of the URLs scheduled so far, shared by all workers.
+
+    Lives in SQLite so memory stays flat however many URLs the crawl sees.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # Rebuilt from the journal on resume, so it doesn't need to survive a power cut
+        self.db.execute("PRAGMA synchronous=OFF")
+        self.db.execute("CREATE TABLE IF NOT EXISTS seen (url TEXT PRIMARY KEY) WITHOUT ROWID")
+
+    def add(self, url):
+        """Record url; return True if it had not been seen before"""
+        with self.lock:
+            return self.db.execute("INSERT OR IGNORE INTO seen (url) VALUES (?)", (url,)).rowcount == 1
+
+    def add_many(self, urls):
+        with self.lock:
+            self.db.executemany("INSERT OR IGNORE INTO seen (url) VALUES (?)", ((url,) for url in urls))
+
+    def __contains__(self, url):
+        with self.lock:
+            return self.db.execute("SELECT 1 FROM seen WHERE url = ?", (url,)).fetchone() is not None
+
+    def __len__(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def close(self, remove=False):
+        self.db.close()
+        if remove:
+            os.remove(self.path)
+
+url_frontier = None
+
+def schedule_profiles(profile_urls):
+    """Normalise discovered profile URLs and drop those already scheduled in this crawl"""
+    scheduled = []
+    for profile_url in profile_urls:
+        profile_url = normalize_url(profile_url)
+        if url_frontier is None or url_frontier.add(profile_url):
+            scheduled.append(profile_url)
+        else:
+            metrics.incr("frontier.duplicates")
+    return scheduled
+
+# --- Crawl Journal (checkpoint / resume) ---
+class CrawlJournal:
+    """Append-only record of completed list pages and the profiles written from them.
+
+    One JSON line per finished page, fsynced after the CSV rows it covers,
+    so after a crash we know exactly which pages and profiles are on disk.
+    Dead-lettered profiles get a line of their own as soon as they fail.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.completed_pages = set()
+        self.written_urls = set()
+        self.failed_pages = set()  # List pages that failed this run; never journaled, so retried on resume
+        self.dead_letters = {}  # Profile URL -> error, for profiles that failed before the crash
+        self.complete = False
+
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # Torn last line from the crash; everything before it is good
+                    if record.get("complete"):
+                        self.complete = True
+                        continue
+                    if "dead_letter" in record:
+                        self.dead_letters[record["dead_letter"]] = record["error"]
+                        continue
+                    self.completed_pages.add(record["page"])
+                    self.written_urls.update(record["profiles"])
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def page_done(self, page_num):
+        return page_num in self.completed_pages
+
+    def page_failed(self, page_num):
+        with self.lock:
+            self.failed_pages.add(page_num)
+
+    def unwritten(self, rows):
+        return [row for row in rows if row["Profile URL"] not in self.written_urls]
+
+    def record_pages(self, pages):
+        """Journal (page_num, profile_urls) pairs whose rows are already durable"""
+        with self.lock:
+            for page_num, profile_urls in pages:
+                self.file.write(json.dumps({"page": page_num, "profiles": profile_urls}) + "\n")
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            for page_num, profile_urls in pages:
+                self.completed_pages.add(page_num)
+                self.written_urls.update(profile_urls)
+
+    def record_dead_letter(self, url, error):
+        """Journal a failed profile before its page can be journaled as done"""
+        with self.lock:
+            self.file.write(json.dumps({"dead_letter": url, "error": error}) + "\n")
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.dead_letters[url] = error
+
+    def mark_complete(self):
+        """This category is done; keep the journal until the whole run is"""
+        with self.lock:
+            self.file.write(json.dumps({"complete": True}) + "\n")
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.complete = True
+
+    def finish(self):
+        """The crawl completed: the next run starts from scratch"""
+        self.file.close()
+        os.remove(self.path)
+
+crawl_journal = None
+
+# --- Output Sinks ---
+class CsvSink:
+    """Rows appended to a CSV file; can be reopened to resume a crashed crawl"""
+    extension = ".csv"
+    resumable = True
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.existing_urls = set()  # Profile URLs already in the file when resuming
+        if resume:
+            truncate_partial_line(path)
+            self.existing_urls = self.read_urls(path)
+            self.file = open(path, 'a', newline='', encoding='utf-8')
+            self.writer = csv.DictWriter(self.file, fieldnames=FIELDNAMES)
+            if self.file.tell() == 0:
+                # Crashed before the header reached disk (or it was torn and cut off above)
+                self.writer.writeheader()
+        else:
+            self.file = open(path, 'w', newline='', encoding='utf-8')
+            self.writer = csv.DictWriter(self.file, fieldnames=FIELDNAMES)
+            self.writer.writeheader()
+
+    @staticmethod
+    def read_urls(path):
+        with open(path, newline='', encoding='utf-8') as f:
+            return {row["Profile URL"] for row in csv.DictReader(f) if row.get("Profile URL")}
+
+    def write_rows(self, rows):
+        self.writer.writerows(rows)
+
+    def flush(self):
+        self.file.flush()
+
+    def sync(self):
+        """Make everything written so far durable"""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+class JsonLinesSink(CsvSink):
+    """One JSON object per row; appendable and resumable like CSV"""
+    extension = ".jsonl"
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.existing_urls = set()
+        if resume:
+            truncate_partial_line(path)
+            self.existing_urls = self.read_urls(path)
+        self.file = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    @staticmethod
+    def read_urls(path):
+        with open(path, encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        return {row["Profile URL"] for row in rows if row.get("Profile URL")}
+
+    def write_rows(self, rows):
+        self.file.writelines(json.dumps({name: row.get(name) for name in FIELDNAMES}, ensure_ascii=False) + "\n"
+                             for row in rows)
+
+class ColumnarSink:
+    """Buffers rows into record batches of ROW_GROUP_SIZE for a pyarrow writer.
+
+    open_writer(path, schema) creates the format's writer. The file footer
+    is only written on close, so a crashed crawl can't be resumed from these
+    formats; it starts over instead.
+    """
+    extension = None
+    resumable = False
+
+    def __init__(self, path, open_writer):
+        if pyarrow is None:
+            raise RuntimeError("Parquet and Arrow output need pyarrow: pip install pyarrow")
+        self.path = path
+        self.existing_urls = set()
+        self.schema = pyarrow.schema([(name, pyarrow.string()) for name in FIELDNAMES])
+        self.pending = []
+        self.writer = open_writer(path, self.schema)
+
+    def write_rows(self, rows):
+        self.pending.extend(rows)
+        while len(self.pending) >= ROW_GROUP_SIZE:
+            self.write_batch(self.pending[:ROW_GROUP_SIZE])
+            del self.pending[:ROW_GROUP_SIZE]
+
+    def write_batch(self, rows):
+        columns = [[row.get(name) for row in rows] for name in FIELDNAMES]
+        self.writer.write_batch(pyarrow.record_batch(columns, schema=self.schema))
+
+    def flush(self):
+        pass  # Small row groups would defeat the point; rows wait for a full batch
+
+    def sync(self):
+        pass
+
+    def close(self):
+        if self.pending:
+            self.write_batch(self.pending)
+            self.pending = []
+        self.writer.close()
+
+class ParquetSink(ColumnarSink):
+    extension = ".parquet"
+
+    def __init__(self, path, resume=False):
+        super().__init__(path, lambda path, schema: pyarrow_parquet.ParquetWriter(path, schema))
+
+class ArrowSink(ColumnarSink):
+    """Arrow IPC file format (Feather v2)"""
+    extension = ".arrow"
+
+    def __init__(self, path, resume=False):
+        super().__init__(path, lambda path, schema: pyarrow.ipc.new_file(path, schema))
+
+class SqliteSink:
+    """Listings table upserted by Profile URL, kept across runs.
+
+    Each row records when the listing was first and last seen, so a listing
+    missing from the latest run is one whose last_seen is older than the rest.
+    Writes are committed in batches rather than per row.
+    """
+    extension = ".sqlite"
+    resumable = True  # Nothing is ever truncated; a rerun just upserts again
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.existing_urls = set()
+        self.seen_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.pending = 0  # Rows upserted since the last commit
+        self.columns = [name.lower().replace(" ", "_") for name in FIELDNAMES]
+        self.db = sqlite3.connect(path, check_same_thread=False)  # Written from the writer stage's thread
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(f"CREATE TABLE IF NOT EXISTS listings ("
+                        f"{', '.join(f'{column} TEXT' for column in self.columns)}, "
+                        f"first_seen TEXT NOT NULL, last_seen TEXT NOT NULL, PRIMARY KEY (profile_url))")
+        updates = ", ".join(f"{column} = excluded.{column}" for column in self.columns + ["last_seen"])
+        self.upsert = (f"INSERT INTO listings ({', '.join(self.columns)}, first_seen, last_seen) "
+                       f"VALUES ({', '.join('?' * (len(self.columns) + 2))}) "
+                       f"ON CONFLICT (profile_url) DO UPDATE SET {updates}")
+
+    @staticmethod
+    def read_urls(path):
+        return set()  # The journal already lists every committed row
+
+    def write_rows(self, rows):
+        self.db.executemany(self.upsert, ([row.get(name) for name in FIELDNAMES] + [self.seen_at, self.seen_at]
+                                          for row in rows))
+        self.pending += len(rows)
+
+    def flush(self):
+        if self.pending >= SQLITE_BATCH_ROWS:
+            self.sync()
+
+    def sync(self):
+        self.db.commit()
+        self.pending = 0
+
+    def close(self):
+        self.sync()
+        self.db.close()
+
+OUTPUT_SINKS = {"csv": CsvSink, "jsonl": JsonLinesSink, "parquet": ParquetSink, "arrow": ArrowSink,
+                "sqlite": SqliteSink}
+
+def truncate_partial_line(path):
+    """Drop a half-written last row left by a crash"""
+    with open(path, 'rb+') as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+
+# --- Writer Stage ---
+class WriterFailed(RuntimeError):
+    """The writer stage couldn't write the output; the crawl has to stop"""
+
+class WriterStage:
+    """Owns the output sink on its own thread, keeping disk I/O off the crawl's critical path.
+
+    Any number of producers queue rows and end-of-page markers; the thread
+    writes them out every WRITE_BATCH_ROWS rows, after WRITE_FLUSH_SECONDS,
+    and at close. A page is only journaled once the batch holding its rows
+    has been synced, so the journal never claims rows that aren't on disk.
+    """
+
+    def __init__(self, sink, journal=None):
+        self.sink = sink
+        self.journal = journal
+        self.queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        self.error = None
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def write(self, rows):
+        self.put((rows, None))
+
+    def end_page(self, page_num, profile_urls):
+        """Every row of page_num has been queued; journal it once they are written"""
+        self.put(([], (page_num, profile_urls)))
+
+    def put(self, item):
+        if self.error:
+            raise WriterFailed(f"Output writer failed: {self.error}") from self.error
+        self.queue.put(item)
+
+    def close(self):
+        """Write out whatever is still queued and stop the thread"""
+        self.queue.put(_STOP)
+        self.thread.join()
+        if self.error:
+            raise WriterFailed(f"Output writer failed: {self.error}") from self.error
+
+    def run(self):
+        rows, pages = [], []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
             try:
-                # Extract profile URL
-                name_tag = company.select_one('h3 a')
-                if name_tag and name_tag.get('href'):
-                    profile_url = BASE_URL + name_tag['href']
-                    print(f"  [{i}/{len(companies)}] Processing: {name_tag.get_text(strip=True)}")
-
-                    # Extract profile data
-                    data = extract_from_profile(profile_url)
-                    if data and data.get("Company Name") != "-":
-                        listings.append(data)
-                        print(f"    ✅ Successfully extracted data for: {data['Company Name']}")
-                    else:
-                        print(f"    ❌ Failed to extract data")
-
-                    # Add delay between profile requests
-                    time.sleep(1)
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None  # Flush interval is up
+
+            if item is not None and item is not _STOP:
+                new_rows, page = item
+                rows.extend(new_rows)
+                if page:
+                    pages.append(page)
+                if deadline is None:
+                    deadline = time.monotonic() + WRITE_FLUSH_SECONDS
+                if len(rows) < WRITE_BATCH_ROWS:
+                    continue
+
+            if rows or pages:
+                self.flush(rows, pages)
+                rows, pages = [], []
+            deadline = None
+            if item is _STOP:
+                return
+
+    def flush(self, rows, pages):
+        if self.error:
+            return  # Keep draining the queue so producers don't block
+        try:
+            with metrics.timer("write_seconds"):
+                self.sink.write_rows(rows)
+                if self.journal and pages:
+                    # The rows must be durable before the journal says they are
+                    self.sink.sync()
+                    self.journal.record_pages(pages)
                 else:
-                    print(f"  ⚠️ No profile URL found for company {i}")
+                    self.sink.flush()
+            metrics.incr("write_batches")
+            metrics.incr("rows_written", len(rows))
+        except Exception as e:
+            metrics.incr("errors", stage="write", type=type(e).__name__)
+            self.error = e
+            print(f"❌ Error writing output: {e}")
 
-            except Exception as e:
-                print(f"  ⚠️ Error processing company {i}: {e}")
+# --- Page Loop ---
+def page_url_for(page_num, category_url=CATEGORY_URL):
+    return category_url if page_num == 1 else f"{category_url}/{page_num}"
+
+def known_page_html(page_num, first_page_html):
+    """HTML already fetched for this page by get_total_pages, or None"""
+    return first_page_html if page_num == 1 else None
+
+def fetch_list_page(page_url, page_num, first_page_html):
+    html = known_page_html(page_num, first_page_html)
+    if html is None:
+        log_verbose(f"  Fetching list page: {page_url}")
+        html = fetch(page_url).text
+    return html
+
+def write_page(writer, page_num, rows, total_scraped):
+    if crawl_journal:
+        rows = crawl_journal.unwritten(rows)
+
+    # Hand the rows to the writer stage; it writes them out in batches
+    writer.write(rows)
+    writer.end_page(page_num, [row["Profile URL"] for row in rows])
+
+    total_scraped += len(rows)
+    print(f"✅ Page {page_num} completed. Added {len(rows)} listings. Total: {total_scraped}")
+    return total_scraped
+
+def skip_failed_page(page_num):
+    """Leave a list page that failed after retries unjournaled, so the next run retries it.
+
+    Returns True once MAX_FAILED_PAGES pages have failed and the crawl should stop.
+    """
+    print(f"⚠️ Skipping page {page_num}; it will be retried when the crawl is resumed")
+    if not crawl_journal:
+        return False
+    crawl_journal.page_failed(page_num)
+    if len(crawl_journal.failed_pages) >= MAX_FAILED_PAGES:
+        print(f"❌ {MAX_FAILED_PAGES} list pages failed, giving up on this category for now")
+        return True
+    return False
+
+def crawl_sync(writer, max_workers, total_pages, category_url=CATEGORY_URL, first_page_html=None):
+    total_scraped = 0
+
+    for page_num in range(1, total_pages + 1):
+        if crawl_journal and crawl_journal.page_done(page_num):
+            continue
+        page_url = page_url_for(page_num, category_url)
+        print(f"\n📄 Scraping page {page_num}/{total_pages}")
+
+        try:
+            rows = scrape_list_page(page_url, max_workers=max_workers,
+                                    html=known_page_html(page_num, first_page_html))
+
+            if rows is PAGE_FAILED:
+                if skip_failed_page(page_num):
+                    break
                 continue
+            if rows is None:
+                print(f"No data found on page {page_num}. Stopping scraper.")
+                break
 
-        return listings
+            total_scraped = write_page(writer, page_num, rows, total_scraped)
 
-    except Exception as e:
-        print(f"  ❌ Error scraping list page {url}: {e}")
-        return []
+        except WriterFailed:
+            raise  # Nothing more can be saved, so stop fetching
+        except Exception as e:
+            metrics.incr("errors", stage="page", type=type(e).__name__)
+            print(f"❌ Error on page {page_num}: {e}")
+            if skip_failed_page(page_num):
+                break
 
-# --- Main Execution ---
-def main():
-    print("🚀 Starting car rental scraper...")
-    print(f"Target: {CATEGORY_URL}")
-
-    with open(OUTPUT_CSV, 'w', newline='', encoding='utf-8') as f:
-        fieldnames = [
-            "Company Name", "Address", "Contact Number", "Mobile Phone",
-            "Website Address", "Company Manager", "Profile URL"
-        ]
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-
-        total_scraped = 0
-
-        for page_num in range(1, 200):  # Increased to 500 pages to capture all 3962 listings
-            # Construct page URL
-            if page_num == 1:
-                page_url = CATEGORY_URL
-            else:
-                page_url = f"{CATEGORY_URL}/{page_num}"
+    return total_scraped
 
-            print(f"\n📄 Scraping page {page_num}/199")
+async def crawl_async(writer, concurrency, total_pages, category_url=CATEGORY_URL, first_page_html=None):
+    if aiohttp is None:
+        raise RuntimeError("The async engine needs aiohttp: pip install aiohttp")
+
+    total_scraped = 0
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    timeout = aiohttp.ClientTimeout(total=15)
+    connector = aiohttp.TCPConnector(limit=max(1, concurrency), limit_per_host=max(1, concurrency),
+                                     keepalive_timeout=KEEPALIVE_SECONDS, ttl_dns_cache=300)
+
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as client:
+        for page_num in range(1, total_pages + 1):
+            if crawl_journal and crawl_journal.page_done(page_num):
+                continue
+            page_url = page_url_for(page_num, category_url)
+            print(f"\n📄 Scraping page {page_num}/{total_pages}")
 
             try:
-                rows = scrape_list_page(page_url)
+                rows = await scrape_list_page_async(client, page_url, semaphore,
+                                                    html=known_page_html(page_num, first_page_html))
 
-                if not rows:
+                if rows is PAGE_FAILED:
+                    if skip_failed_page(page_num):
+                        break
+                    continue
+                if rows is None:
                     print(f"No data found on page {page_num}. Stopping scraper.")
                     break
 
-                # Write rows to CSV
-                writer.writerows(rows)
-                f.flush()  # Ensure data is written to file
-
-                total_scraped += len(rows)
-                print(f"✅ Page {page_num} completed. Added {len(rows)} listings. Total: {total_scraped}")
+                total_scraped = write_page(writer, page_num, rows, total_scraped)
 
+            except WriterFailed:
+                raise  # Nothing more can be saved, so stop fetching
             except Exception as e:
+                metrics.incr("errors", stage="page", type=type(e).__name__)
                 print(f"❌ Error on page {page_num}: {e}")
+                if skip_failed_page(page_num):
+                    break
+
+    return total_scraped
+
+# --- Pipelined Crawl ---
+_STOP = object()  # Sentinel passed down the pipeline when a stage is done
+
+def discover_profiles(url_queue, window, num_workers, total_pages, category_url, first_page_html=None):
+    """Stage 1: walk the list pages and stream profile URLs into the queue.
+
+    Each URL takes a slot in window, given back once its row is written, so
+    one slow profile can't leave an unbounded number of rows waiting behind it.
+    """
+    seq = 0
+    try:
+        for page_num in range(1, total_pages + 1):
+            if crawl_journal and crawl_journal.page_done(page_num):
                 continue
+            page_url = page_url_for(page_num, category_url)
+            print(f"\n📄 Discovering page {page_num}/{total_pages}")
+
+            try:
+                profile_urls = parse_list_page(fetch_list_page(page_url, page_num, first_page_html))
+            except Exception as e:
+                metrics.incr("errors", stage="list", type=type(e).__name__)
+                print(f"  ❌ Error scraping list page {page_url}: {e}")
+                if skip_failed_page(page_num):
+                    break
+                continue
+
+            if not profile_urls:
+                print(f"No data found on page {page_num}. Stopping discovery.")
+                break
+
+            for profile_url in schedule_profiles(profile_urls):
+                # Blocks when the extractors or the writer fall behind, keeping memory flat
+                window.acquire()
+                url_queue.put((seq, page_num, profile_url))
+                seq += 1
+    finally:
+        for _ in range(num_workers):
+            url_queue.put(_STOP)
+
+def extract_profiles(url_queue, row_queue):
+    """Stage 2: fetch and parse profiles until discovery is finished"""
+    while True:
+        item = url_queue.get()
+        if item is _STOP:
+            row_queue.put(_STOP)
+            return
+        seq, page_num, profile_url = item
+        row_queue.put((seq, page_num, extract_from_profile(profile_url)))
+
+def crawl_pipeline(writer, max_workers, total_pages, category_url=CATEGORY_URL, first_page_html=None):
+    """Stage 3 runs here: write rows in discovery order as they complete"""
+    num_workers = max(1, max_workers)
+    url_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    row_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    window = threading.BoundedSemaphore(PIPELINE_REORDER_WINDOW)
+
+    discovery_args = (url_queue, window, num_workers, total_pages, category_url, first_page_html)
+    threads = [threading.Thread(target=discover_profiles, args=discovery_args, daemon=True)]
+    threads += [threading.Thread(target=extract_profiles, args=(url_queue, row_queue), daemon=True)
+                for _ in range(num_workers)]
+    for thread in threads:
+        thread.start()
+
+    # Workers finish out of order; hold early results until their turn comes
+    pending = {}
+    next_seq = 0
+    stopped = 0
+    current_page = None
+    page_urls = []
+    total_scraped = 0
+
+    def finish_page():
+        writer.end_page(current_page, page_urls)
+        print(f"✅ Page {current_page} completed. Added {len(page_urls)} listings. Total: {total_scraped}")
+
+    while stopped < num_workers:
+        item = row_queue.get()
+        if item is _STOP:
+            stopped += 1
+            continue
+        pending[item[0]] = item
 
-            # Add delay between pages
-            print(f"⏳ Waiting before next page...")
-            time.sleep(2)
+        while next_seq in pending:
+            _, page_num, data = pending.pop(next_seq)
+            next_seq += 1
+            window.release()
 
-    print(f"\n🎉 Scraping completed! Total listings scraped: {total_scraped}")
-    print(f"📁 Data saved to: {OUTPUT_CSV}")
+            if page_num != current_page:
+                if current_page is not None:
+                    finish_page()
+                current_page = page_num
+                page_urls = []
+
+            if data and data.get("Company Name") != "-":
+                if crawl_journal and data["Profile URL"] in crawl_journal.written_urls:
+                    continue  # Written before the crash
+                writer.write([data])
+                page_urls.append(data["Profile URL"])
+                total_scraped += 1
+                metrics.incr("profiles", result="extracted")
+                log_verbose(f"    ✅ Successfully extracted data for: {data['Company Name']}")
+            else:
+                metrics.incr("profiles", result="failed")
+                log_verbose(f"    ❌ Failed to extract data")
+
+    if current_page is not None:
+        finish_page()
+
+    for thread in threads:
+        thread.join()
+    return total_scraped
+
+# --- Incremental Crawl ---
+class CrawlState:
+    """Profiles seen on earlier runs: list snippet fingerprint and last extracted row"""
+
+    def __init__(self, path):
+        self.path = path
+        self.profiles = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.profiles = json.load(f)
+
+    def get(self, url):
+        return self.profiles.get(url)
+
+    def update(self, url, fingerprint, row):
+        self.profiles[url] = {"fingerprint": fingerprint, "row": row}
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.profiles, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+def crawl_incremental(writer, max_workers, total_pages, category_url=CATEGORY_URL, first_page_html=None):
+    """Rebuild the full output, only visiting profiles that are new or whose list snippet changed.
+
+    Unchanged profiles are written from the stored rows. New, changed and
+    vanished listings also go to the delta CSV with a Change column.
+    """
+    state_file = category_file(STATE_FILE, category_url)
+    delta_csv = category_file(DELTA_CSV, category_url)
+    state = CrawlState(state_file)
+    print(f"🗂️ Incremental mode: {len(state.profiles)} profiles known from earlier runs")
+    total_scraped = 0
+    fetched = 0
+    complete = True
+
+    with open(delta_csv, 'w', newline='', encoding='utf-8') as delta_f, \
+            ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        delta_writer = csv.DictWriter(delta_f, fieldnames=FIELDNAMES + ["Change"])
+        delta_writer.writeheader()
+
+        for page_num in range(1, total_pages + 1):
+            page_url = page_url_for(page_num, category_url)
+            print(f"\n📄 Checking page {page_num}/{total_pages}")
+
+            try:
+                entries = parse_list_entries(fetch_list_page(page_url, page_num, first_page_html))
+            except Exception as e:
+                metrics.incr("errors", stage="list", type=type(e).__name__)
+                print(f"  ❌ Error scraping list page {page_url}: {e}")
+                complete = False
+                break
+
+            if not entries:
+                print(f"No data found on page {page_num}. Stopping scraper.")
+                break
+
+            entries = [(url, fingerprint) for url, fingerprint in
+                       ((normalize_url(url), fingerprint) for url, fingerprint in entries)
+                       if url_frontier.add(url)]
+            stale = [url for url, fingerprint in entries
+                     if (state.get(url) or {}).get("fingerprint") != fingerprint]
+            fresh = dict(zip(stale, executor.map(extract_from_profile, stale)))
+            fetched += len(stale)
+
+            rows = []
+            for url, fingerprint in entries:
+                known = state.get(url)
+                data = fresh.get(url)
+                if url in fresh and data and data.get("Company Name") != "-":
+                    delta_writer.writerow({**data, "Change": "changed" if known else "new"})
+                    state.update(url, fingerprint, data)
+                    rows.append(data)
+                elif known:
+                    # Unchanged, or the refetch failed: keep the last good row
+                    rows.append(known["row"])
+                else:
+                    metrics.incr("profiles", result="failed")
+                    print(f"    ❌ Failed to extract data for {url}")
+
+            if rows:
+                total_scraped = write_page(writer, page_num, rows, total_scraped)
+            delta_f.flush()
+
+        # Only a crawl that reached the last page can tell a listing has gone
+        removed = [url for url in state.profiles if url not in url_frontier] if complete else []
+        for url in removed:
+            delta_writer.writerow({**state.get(url)["row"], "Change": "removed"})
+            del state.profiles[url]
+
+    state.save()
+    print(f"🗂️ Visited {fetched} new/changed profiles, {len(removed)} removed. Delta saved to: {delta_csv}")
+    return total_scraped
+
+# --- Categories ---
+CATEGORY_LINK_PATTERN = re.compile(r'^/category/([^/?#]+)/?$')
+
+def category_slug(category_url):
+    """File-name form of a category's name, e.g. car-rental -> car_rental"""
+    return urlsplit(category_url).path.rstrip('/').rsplit('/', 1)[-1].replace('-', '_')
+
+def category_file(template, category_url):
+    return template.format(slug=category_slug(category_url))
+
+def category_url_for(entry):
+    """Accept either a full category URL or just its name ("car-rental")"""
+    entry = entry.strip()
+    if "://" in entry:
+        return normalize_url(entry)
+    return f"{BASE_URL}/category/{entry.strip('/')}"
+
+def load_category_manifest(path):
+    """Read categories from a file: one URL or category name per line, # for comments"""
+    with open(path, encoding='utf-8') as f:
+        entries = [line.split('#', 1)[0].strip() for line in f]
+    return [category_url_for(entry) for entry in entries if entry]
+
+def discover_categories(index_url):
+    """Collect the /category/<name> links from a category index page"""
+    soup = parse_html(fetch(index_url).text)
+    categories = []
+    for link in soup.select('a[href]'):
+        href = urlsplit(urljoin(index_url, link.attr('href')))
+        if CATEGORY_LINK_PATTERN.match(href.path):
+            category_url = category_url_for(urlunsplit((href.scheme, href.netloc, href.path, '', '')))
+            if category_url not in categories:
+                categories.append(category_url)
+    print(f"🗂️ Discovered {len(categories)} categories on {index_url}")
+    return categories
+
+# --- Main Execution ---
+def main(engine=ENGINE, max_workers=MAX_WORKERS, parser=None, partial=None, diagnostics=None,
+         cache_dir=None, incremental=False, fresh=False, categories=None, http2=False,
+         output_format=OUTPUT_FORMAT, verbose=None, metrics_file=None, metrics_port=None, trace=False,
+         profile=False, profile_cprofile=0.0, parse_processes=PARSE_PROCESSES):
+    global PARTIAL_PARSING, DIAGNOSTICS, VERBOSE, url_frontier, run_profiler
+    if parser:
+        use_parser_backend(parser)
+    if cache_dir:
+        enable_http_cache(cache_dir)
+    if parse_processes and (engine != "async" or incremental) and max_workers < parse_processes:
+        # Each fetch thread waits on its own parse, so fewer threads than processes leaves some idle
+        print(f"🧩 Raising workers from {max_workers} to {parse_processes} to keep every parse process busy")
+        max_workers = parse_processes
+    if engine != "async":
+        # Workers plus the list-page / discovery fetches; async sizes its own connector
+        configure_http_client(max(1, max_workers) + 2, http2)
+    if partial is not None:
+        PARTIAL_PARSING = partial
+    if diagnostics is not None:
+        DIAGNOSTICS = diagnostics
+    if verbose is not None:
+        VERBOSE = verbose
+    metrics.tracing = trace
+    metrics_server = serve_metrics(metrics_port) if metrics_port else None
+    if profile:
+        run_profiler = RunProfiler(profile_cprofile)
+        run_profiler.start()
+    if parse_processes:
+        start_parse_pool(parse_processes)
+
+    categories = categories or [CATEGORY_URL]
+    print("🚀 Starting yelu.in scraper...")
+    print(f"Targets: {', '.join(categories)}")
+    print(f"Engine: {engine}, workers: {max_workers}, parser: {PARSER_BACKEND}, output: {output_format}, "
+          f"rate limit: {REQUESTS_PER_SECOND} req/s per host (adaptive {MIN_REQUESTS_PER_SECOND}-{MAX_REQUESTS_PER_SECOND})")
+
+    # One frontier for every category, so a company listed twice is fetched once.
+    # It starts out holding exactly what is already on disk.
+    if os.path.exists(FRONTIER_DB):
+        os.remove(FRONTIER_DB)
+    url_frontier = UrlFrontier(FRONTIER_DB)
+
+    journals = []
+    grand_total = 0
+    for category_url in categories:
+        total_scraped, journal = crawl_category(category_url, engine, max_workers, incremental, fresh,
+                                                    output_format)
+        grand_total += total_scraped
+        if journal:
+            journals.append(journal)
+
+    # Only now is the whole run done; until here a crash resumes from the journals
+    unfinished = [journal for journal in journals if not journal.complete]
+    for journal in journals:
+        if unfinished:
+            journal.file.close()  # Kept so the next run skips what's done and retries the rest
+        else:
+            journal.finish()
+    url_frontier.close(remove=True)
+    url_frontier = None
+    stop_parse_pool()
+
+    if len(categories) > 1:
+        print(f"\n🏁 All {len(categories)} categories completed! Total listings scraped: {grand_total}")
+    print(f"🚦 Final request rates: {rate_limiter.rates()}")
+    if DIAGNOSTICS:
+        print(f"📊 Diagnostics: {json.dumps(metrics.snapshot(), sort_keys=True)}")
+    if run_profiler:
+        run_profiler.write_report(PROFILE_REPORT, run_profiler.stop())
+        run_profiler = None
+        print(f"⏱️ Profile report saved to: {PROFILE_REPORT}")
+    if metrics_file:
+        metrics.export(metrics_file)
+        print(f"📊 Metrics saved to: {metrics_file}")
+    if metrics_server:
+        metrics_server.shutdown()
+    return grand_total
+
+def crawl_category(category_url, engine, max_workers, incremental, fresh, output_format=OUTPUT_FORMAT):
+    """Crawl one category into its own output file; return (listings scraped, journal)"""
+    global crawl_journal
+    sink_class = OUTPUT_SINKS[output_format]
+    output_file = category_file(OUTPUT_FILE, category_url) + sink_class.extension
+    journal_file = category_file(JOURNAL_FILE, category_url)
+    print(f"\n🗂️ Category: {category_url}")
+
+    resume = False
+    if not incremental:
+        if fresh and os.path.exists(journal_file):
+            os.remove(journal_file)
+        if os.path.exists(journal_file) and not os.path.exists(output_file):
+            os.remove(journal_file)  # Output is gone, so the journal is meaningless
+        resume = os.path.exists(journal_file)
+        crawl_journal = CrawlJournal(journal_file)
+
+        if crawl_journal.complete:
+            saved_urls = sink_class.read_urls(output_file) if sink_class.resumable else set()
+            url_frontier.add_many(crawl_journal.written_urls | saved_urls)
+            print(f"♻️ Already completed before the restart, skipping ({output_file})")
+            journal, crawl_journal = crawl_journal, None
+            return 0, journal
+        if resume and not sink_class.resumable:
+            print(f"⚠️ An unfinished {output_format} file can't be resumed, starting over")
+            crawl_journal.file.close()
+            os.remove(journal_file)
+            crawl_journal = CrawlJournal(journal_file)
+            resume = False
+
+    sink = sink_class(output_file, resume=resume)
+    writer = WriterStage(sink, crawl_journal)
+    try:
+        total_pages, _, first_page_html = get_total_pages(category_url)
+        if resume:
+            crawl_journal.written_urls.update(sink.existing_urls)
+            url_frontier.add_many(crawl_journal.written_urls)
+            failed = {url: error for url, error in crawl_journal.dead_letters.items()
+                      if url not in crawl_journal.written_urls}
+            dead_letters.restore(failed)
+            print(f"♻️ Resuming: {len(crawl_journal.completed_pages)} pages and "
+                  f"{len(crawl_journal.written_urls)} listings already saved, {len(failed)} failed profiles to retry")
+
+        if incremental:
+            total_scraped = crawl_incremental(writer, max_workers, total_pages, category_url, first_page_html)
+        elif engine == "async":
+            total_scraped = asyncio.run(crawl_async(writer, max_workers, total_pages, category_url, first_page_html))
+        elif engine == "pipeline":
+            total_scraped = crawl_pipeline(writer, max_workers, total_pages, category_url, first_page_html)
+        elif engine == "sync":
+            total_scraped = crawl_sync(writer, max_workers, total_pages, category_url, first_page_html)
+        else:
+            raise ValueError(f"Unknown engine: {engine!r} (expected one of {ENGINES})")
+
+        # Incremental runs already fell back to the stored rows, so only record failures there
+        total_scraped += retry_dead_letters(writer, category_url, retry=not incremental)
+    finally:
+        try:
+            writer.close()
+        finally:
+            sink.close()
+
+    journal, crawl_journal = crawl_journal, None
+    if journal and journal.failed_pages:
+        print(f"\n⚠️ Unfinished: list pages {', '.join(map(str, sorted(journal.failed_pages)))} failed, "
+              f"run again to resume ({journal_file} is kept). Total listings scraped: {total_scraped}")
+    else:
+        if journal:
+            journal.mark_complete()
+        print(f"\n🎉 Scraping completed! Total listings scraped: {total_scraped}")
+    print(f"📁 Data saved to: {output_file}")
+    return total_scraped, journal
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Scrape business listings from yelu.in categories")
+    parser.add_argument("--categories", metavar="FILE",
+                        help="manifest with one category URL or name per line (default: car-rental)")
+    parser.add_argument("--discover-categories", metavar="INDEX_URL",
+                        help="crawl every /category/ link found on this index page")
+    parser.add_argument("--engine", choices=ENGINES, default=ENGINE)
+    parser.add_argument("--workers", type=int, default=None,
+                        help=f"parallel profile fetches (default: {MAX_WORKERS} sync, {ASYNC_CONCURRENCY} async)")
+    parser.add_argument("--parser", choices=PARSER_BACKENDS, default=PARSER_BACKEND,
+                        help="HTML parser backend")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default=OUTPUT_FORMAT,
+                        help="output file format (parquet and arrow need pyarrow)")
+    parser.add_argument("--parse-processes", type=int, nargs="?", const=os.cpu_count(), default=PARSE_PROCESSES,
+                        metavar="N", help=f"parse profile pages in N processes (default without N: {os.cpu_count()}); "
+                        "--workers is raised to N if lower")
+    parser.add_argument("--full-parse", action="store_true",
+                        help="build the whole DOM instead of only the parts we extract")
+    parser.add_argument("--cache", nargs="?", const=HTTP_CACHE_DIR, default=None, metavar="DIR",
+                        help=f"revalidate against an on-disk response cache (default dir: {HTTP_CACHE_DIR})")
+    parser.add_argument("--incremental", action="store_true",
+                        help=f"only visit new or changed profiles, tracked in {STATE_FILE}; writes {DELTA_CSV}")
+    parser.add_argument("--fresh", action="store_true",
+                        help=f"ignore {JOURNAL_FILE} and start over instead of resuming an unfinished crawl")
+    parser.add_argument("--http2", action="store_true",
+                        help="fetch over HTTP/2 with httpx (sync and pipeline engines)")
+    parser.add_argument("--diagnostics", action="store_true",
+                        help="count company block variants per list page and report them at the end")
+    parser.add_argument("--verbose", action="store_true",
+                        help="print a line for every company and profile (they are always counted)")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="write counters and latency histograms here at the end (.prom for Prometheus text, else JSON)")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help=f"serve Prometheus metrics at http://{METRICS_HOST}:PORT/metrics during the crawl")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"sample stacks and write a per-stage time breakdown to {PROFILE_REPORT}")
+    parser.add_argument("--profile-cprofile", type=float, default=0.0, metavar="SHARE",
+                        help="with --profile, also run cProfile on this share of profile pages (e.g. 0.05)")
+    parser.add_argument("--trace", action="store_true",
+                        help="also record a span per fetch and parse (included in the JSON metrics file)")
+    args = parser.parse_args()
+
+    if args.workers is None:
+        args.workers = ASYNC_CONCURRENCY if args.engine == "async" else MAX_WORKERS
+    categories = None
+    if args.categories:
+        categories = load_category_manifest(args.categories)
+    elif args.discover_categories:
+        categories = discover_categories(args.discover_categories)
+    main(engine=args.engine, max_workers=args.workers, parser=args.parser,
+         partial=not args.full_parse, diagnostics=args.diagnostics,
+         cache_dir=args.cache, incremental=args.incremental, fresh=args.fresh,
+         categories=categories, http2=args.http2, output_format=args.format, verbose=args.verbose,
+         metrics_file=args.metrics, metrics_port=args.metrics_port, trace=args.trace,
+         profile=args.profile, profile_cprofile=args.profile_cprofile, parse_processes=args.parse_processes)
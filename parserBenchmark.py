@@ -0,0 +1,284 @@
+import argparse
+import ast
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+import fixtureServer
+import mainCode
+
+# --- Constants ---
+CORPUS_DIR = "parser_corpus"  # Holds list/*.html and profile/*.html
+TUTORIALS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tutorials")
+CLEAN_NUMBERS_TUTORIALS = ["Level-4-Dynamic-Pagination.py", "Level-5-Storing-in-CSV.py"]
+RECORD_PAGES = 3  # List pages (and all their profiles) saved by --record
+REPEAT = 5  # Timed passes over the corpus; the fastest one is reported
+REGRESSION_THRESHOLD = 0.15  # Growth in CPU time or peak memory vs. --compare results that gets flagged
+
+EDGE_CASE_PROFILES = {
+    "edge-address-first": '<html><body><div id="company_address">12 Main St, Gurgaon</div>'
+                          '<div id="company_name">Address First &amp; Co</div>'
+                          '<div class="info"><div class="label">Contact number</div><div class="text">0124-1</div></div>'
+                          '</body></html>',
+    "edge-info-first": '<html><body><div class="info"><div class="label">Mobile phone</div>'
+                       '<div class="text">98100 1</div></div><div id="company_name">Info First</div></body></html>',
+    "edge-wide-info-first": '<html><body><div class="wide info"><div class="label">Mobile phone</div>'
+                            '<div class="text">98100 2</div></div><div id="company_name">Wide Info First</div>'
+                            '</body></html>',
+    "edge-unquoted-info-first": '<html><body><div class=info><div class=label>Contact number</div>'
+                                '<div class=text>0124-2</div></div><div id=company_name>Unquoted Info First</div>'
+                                '</body></html>',
+    "edge-box-extra-info-first": '<html><body><div class="box extra_info"><div class="info">'
+                                 '<div class="label">Company manager</div>Mr. Early</div></div>'
+                                 '<div id="company_name">Extra Info First</div></body></html>',
+    "edge-no-name": '<html><body><div id="company_address">Nameless Rd</div>'
+                    '<div class="extra_info"><div class="info"><div class="label">Company manager</div>'
+                    'Mr. Nobody</div></div></body></html>',
+}
+
+# --- Corpus ---
+def save_page(path, html):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(html)
+
+def record_corpus(directory, category_url, pages=RECORD_PAGES):
+    """Save live list pages and every profile they link to, going through the scraper's own fetch"""
+    saved = 0
+    for page_num in range(1, pages + 1):
+        html = mainCode.fetch(mainCode.page_url_for(page_num, category_url)).text
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            profile_urls = mainCode.parse_list_page(html)
+        if not profile_urls:
+            break
+        save_page(os.path.join(directory, "list", f"page-{page_num}.html"), html)
+
+        for url in profile_urls:
+            name = re.sub(r"[^\w-]+", "_", url.rstrip("/").rsplit("/", 1)[-1])
+            save_page(os.path.join(directory, "profile", f"{name}.html"), mainCode.fetch(url).text)
+            saved += 1
+    print(f"📁 Recorded {saved} profiles from {category_url} into {directory}")
+
+def synthetic_corpus(directory):
+    """Build a corpus from the fixture server's pages when nothing has been recorded"""
+    config = fixtureServer.parse_args([])
+    for page_num in range(1, RECORD_PAGES + 1):
+        save_page(os.path.join(directory, "list", f"page-{page_num}.html"),
+                  fixtureServer.list_page_html("car-rental", page_num, config))
+        for i in range(config.per_page):
+            company_id = f"{page_num}-{i}"
+            save_page(os.path.join(directory, "profile", f"{company_id}.html"),
+                      fixtureServer.profile_html(company_id, f"car-rental-company-{company_id}", config))
+    # Layouts the partial parser has to fall back on: address or info blocks first, no company name
+    for name, html in EDGE_CASE_PROFILES.items():
+        save_page(os.path.join(directory, "profile", f"{name}.html"), html)
+    print(f"📁 No corpus found; generated a synthetic one in {directory} (use --record for real pages)")
+
+def load_corpus(directory):
+    corpus = {}
+    for kind in ["list", "profile"]:
+        folder = os.path.join(directory, kind)
+        corpus[kind] = []
+        for name in sorted(os.listdir(folder)):
+            with open(os.path.join(folder, name), encoding='utf-8') as f:
+                corpus[kind].append((name, f.read()))
+    return corpus
+
+# --- Tutorial Helpers ---
+def load_tutorial_function(filename, name):
+    """Take one function out of a tutorial script without running it (the scripts scrape on import)"""
+    path = os.path.join(TUTORIALS_DIR, filename)
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), path)
+    node = next(node for node in tree.body if isinstance(node, ast.FunctionDef) and node.name == name)
+    namespace = {"re": re}
+    exec(compile(ast.Module(body=[node], type_ignores=[]), path, "exec"), namespace)
+    return namespace[name]
+
+# --- Measurement ---
+def measure(function, inputs, repeat=REPEAT):
+    """CPU time and throughput from the fastest of several passes, then peak memory from a traced pass.
+
+    tracemalloc only sees Python's allocator, so memory lxml and lexbor
+    allocate in C isn't counted; their Python-side wrappers are.
+    """
+    function(inputs[0])  # Warm up imports and caches
+    cpu_times = []
+    wall_times = []
+    for _ in range(repeat):
+        cpu_started = time.process_time()
+        wall_started = time.perf_counter()
+        for item in inputs:
+            function(item)
+        cpu_times.append(time.process_time() - cpu_started)
+        wall_times.append(time.perf_counter() - wall_started)
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for item in inputs:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            function(item)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "items": len(inputs),
+        "cpu_us_per_item": round(min(cpu_times) / len(inputs) * 1e6, 1),
+        "items_per_sec": round(len(inputs) / min(wall_times), 1),
+        "peak_kib_per_item": round(sum(peaks) / len(peaks) / 1024, 1),
+    }
+
+def available_backends(names):
+    current = mainCode.PARSER_BACKEND
+    backends = []
+    for name in names:
+        try:
+            mainCode.use_parser_backend(name)
+            backends.append(name)
+        except RuntimeError as e:
+            print(f"⚠️ Skipping {name}: {e}")
+    mainCode.use_parser_backend(current)
+    return backends
+
+def benchmark_cases(corpus, backends):
+    """(function, backend, callable, inputs) for everything we time"""
+    list_pages = [html for _, html in corpus["list"]]
+    profiles = [(f"{mainCode.BASE_URL}/company/{name}", html) for name, html in corpus["profile"]]
+
+    cases = []
+    for backend in backends:
+        cases.append(("parse_list_page", backend,
+                      lambda html, b=backend: mainCode.parse_list_page(html, b), list_pages))
+        cases.append(("parse_pagination", backend,
+                      lambda html, b=backend: mainCode.parse_pagination(html, b), list_pages))
+        cases.append(("parse_profile", backend,
+                      lambda profile, b=backend: mainCode.parse_profile(profile[1], profile[0], b), profiles))
+
+    # clean_numbers only sees strings, so it's fed the phone fields parsed out of the corpus
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        rows = [mainCode.parse_profile(html, url) for url, html in profiles]
+    numbers = [row[field] for row in rows for field in ["Contact Number", "Mobile Phone"]]
+    for filename in CLEAN_NUMBERS_TUTORIALS:
+        clean_numbers = load_tutorial_function(filename, "clean_numbers")
+        cases.append((f"clean_numbers ({'-'.join(filename.split('-')[:2])})", "-", clean_numbers, numbers))
+    return cases
+
+# --- Parity ---
+def parser_outputs(corpus, backend):
+    """Everything the scraper extracts from the corpus with one backend"""
+    outputs = {}
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        for name, html in corpus["list"]:
+            outputs[("parse_list_page", name)] = mainCode.parse_list_page(html, backend)
+            outputs[("parse_pagination", name)] = mainCode.parse_pagination(html, backend)
+        for name, html in corpus["profile"]:
+            outputs[("parse_profile", name)] = mainCode.parse_profile(html, f"{mainCode.BASE_URL}/company/{name}", backend)
+    return outputs
+
+def check_parity(corpus, backends):
+    """Compare every backend, with partial and full parsing, against html.parser with full parsing.
+
+    Returns the number of (function, page) results that differ.
+    """
+    partial = mainCode.PARTIAL_PARSING
+    try:
+        mainCode.PARTIAL_PARSING = False
+        reference = parser_outputs(corpus, "html.parser")
+        mismatches = 0
+        for backend in backends:
+            for partial_parsing in [False, True]:
+                mainCode.PARTIAL_PARSING = partial_parsing
+                label = f"{backend} ({'partial' if partial_parsing else 'full'} parsing)"
+                outputs = parser_outputs(corpus, backend)
+                differing = [key for key in reference if outputs[key] != reference[key]]
+                for function, name in differing:
+                    print(f"  ❌ {label}: {function}({name}) gave {outputs[(function, name)]!r}, "
+                          f"expected {reference[(function, name)]!r}")
+                if not differing:
+                    print(f"  ✅ {label}: {len(reference)} results match")
+                mismatches += len(differing)
+    finally:
+        mainCode.PARTIAL_PARSING = partial
+    return mismatches
+
+def compare(results, baseline_file):
+    """Print changes against an earlier --json file; return the results that regressed"""
+    with open(baseline_file, encoding='utf-8') as f:
+        baseline = {(result["function"], result["backend"], result["partial"]): result
+                    for result in json.load(f)["results"]}
+
+    regressions = []
+    print(f"\n📈 Compared with {baseline_file}:")
+    for result in results:
+        before = baseline.get((result["function"], result["backend"], result["partial"]))
+        label = f"{result['function']}/{result['backend']}"
+        if not before:
+            print(f"  {label}: no earlier result")
+            continue
+        changes = {metric: result[metric] / before[metric] - 1 if before[metric] else 0.0
+                   for metric in ["cpu_us_per_item", "peak_kib_per_item"]}
+        flag = ""
+        if any(change > REGRESSION_THRESHOLD for change in changes.values()):
+            flag = "  ⚠️ regression"
+            regressions.append(result)
+        print(f"  {label}: CPU {changes['cpu_us_per_item']:+.1%}, peak memory {changes['peak_kib_per_item']:+.1%}{flag}")
+    return regressions
+
+def print_results(results):
+    columns = ["function", "backend", "items", "cpu_us_per_item", "items_per_sec", "peak_kib_per_item"]
+    widths = [max(len(column), *(len(str(result[column])) for result in results)) for column in columns]
+    print("\n" + "  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    for result in results:
+        print("  ".join(str(result[column]).ljust(width) for column, width in zip(columns, widths)))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the parsing functions over a corpus of saved pages")
+    parser.add_argument("--corpus", default=CORPUS_DIR, metavar="DIR", help="list/ and profile/ HTML files")
+    parser.add_argument("--record", metavar="CATEGORY_URL",
+                        help=f"save the first {RECORD_PAGES} list pages of this category and their profiles first")
+    parser.add_argument("--parser", nargs="+", choices=mainCode.PARSER_BACKENDS, default=mainCode.PARSER_BACKENDS)
+    parser.add_argument("--full-parse", action="store_true",
+                        help="build the whole DOM instead of only the parts we extract")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="timed passes per case")
+    parser.add_argument("--check-parity", action="store_true",
+                        help="check every backend extracts the same as html.parser instead of timing; fails if not")
+    parser.add_argument("--json", metavar="FILE", help="write the results here")
+    parser.add_argument("--compare", metavar="FILE", help="flag cases using more than "
+                        f"{REGRESSION_THRESHOLD:.0%} more CPU or memory than in this earlier --json file")
+    args = parser.parse_args()
+
+    if args.record:
+        record_corpus(args.corpus, args.record)
+    elif not os.path.isdir(args.corpus):
+        synthetic_corpus(args.corpus)
+    corpus = load_corpus(args.corpus)
+    if args.check_parity:
+        print(f"🧪 Checking parser parity on {len(corpus['list'])} list pages, {len(corpus['profile'])} profiles")
+        if check_parity(corpus, available_backends(args.parser)):
+            sys.exit(1)
+        sys.exit(0)
+    mainCode.PARTIAL_PARSING = not args.full_parse
+    print(f"🧪 Corpus: {len(corpus['list'])} list pages, {len(corpus['profile'])} profiles "
+          f"({'full' if args.full_parse else 'partial'} parsing)")
+
+    results = []
+    for function, backend, call, inputs in benchmark_cases(corpus, available_backends(args.parser)):
+        # The parsers report progress with print(); keep that out of the way but inside the timing
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            stats = measure(call, inputs, max(1, args.repeat))
+        results.append({"function": function, "backend": backend, "partial": not args.full_parse, **stats})
+
+    print_results(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"corpus": args.corpus, "results": results}, f, indent=2)
+        print(f"📁 Results saved to: {args.json}")
+    if args.compare and compare(results, args.compare):
+        sys.exit(1)